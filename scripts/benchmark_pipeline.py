@@ -0,0 +1,490 @@
+#!/usr/bin/env python3
+"""
+benchmark_pipeline.py — Performance Baselines for the Governance Pipeline
+
+This script generates synthetic canonical data (sprints, issues, tasks) at
+several scales, runs the pipeline stages against it, and records wall time
+and peak Python memory for each stage.
+
+Stages:
+- validate     jsonl_to_parquet.py load + validation
+- metrics      extract_metrics.compute_metrics
+- kanban       generate_kanban.render_board
+- timeseries   build_timeseries.collect_all_metrics
+- update       update_status batch parsing + application, then one
+               event_log.submit of a batch (index lookup, group commit,
+               Merkle path update)
+
+It also times CLI startup (`--help`) in a fresh interpreter; update_status.py
+and jsonl_to_parquet.py must start within STARTUP_BUDGET_MS.
+
+Before timing anything it checks correctness: compute_metrics over the
+committed fixture in reports/benchmarks/golden/ must reproduce
+golden/metrics.json (timestamp aside), so an optimisation cannot change
+the output. The Merkle store built over the fixture's tasks, which repeat
+an id, must also agree with an in-memory build that keeps the last
+record per id. A mismatch exits non-zero. After an intended output change,
+refresh the expected file with --update-golden.
+
+Results are written to reports/benchmarks/latest.json. With --save-baseline
+they become reports/benchmarks/baseline.json; with --compare the run is
+checked against that baseline (the first such run becomes the baseline)
+and the script exits non-zero on regression.
+
+Usage:
+    python scripts/benchmark_pipeline.py --scales 1k,100k
+    python scripts/benchmark_pipeline.py --scales 1k --compare
+    python scripts/benchmark_pipeline.py --scales 1k --update-golden
+"""
+
+import argparse
+import json
+import math
+import os
+import platform
+import random
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+
+# === Paths ===
+REPO_ROOT = Path(__file__).resolve().parent.parent
+SCRIPTS_DIR = REPO_ROOT / "scripts"
+BENCH_DIR = REPO_ROOT / "reports" / "benchmarks"
+BASELINE_PATH = BENCH_DIR / "baseline.json"
+LATEST_PATH = BENCH_DIR / "latest.json"
+GOLDEN_DIR = BENCH_DIR / "golden"
+GOLDEN_METRICS_PATH = GOLDEN_DIR / "metrics.json"
+
+SCALES = {"1k": 1_000, "100k": 100_000, "1m": 1_000_000}
+STATUS_FLOW = ["todo", "in_progress", "review", "done"]
+METRICS_FILES_PER_SPRINT = 5
+UPDATE_BATCH_SIZE = 200
+
+# Differences smaller than this are timer noise, whatever the ratio
+MIN_REGRESSION_SECONDS = 0.05
+
+STARTUP_BUDGET_MS = {"update_status.py": 200, "jsonl_to_parquet.py": 200}
+STARTUP_SCRIPTS = ["update_status.py", "jsonl_to_parquet.py"]
+STARTUP_REPEATS = 5
+
+# compute_metrics fields that differ on every run
+VOLATILE_METRICS = {"timestamp"}
+
+sys.path.insert(0, str(SCRIPTS_DIR))
+
+
+# === Synthetic Data ===
+def status_history(rng: random.Random, start: datetime) -> list:
+    """A legal walk along the canonical workflow with increasing timestamps."""
+    steps = rng.randint(1, len(STATUS_FLOW))
+    ts = start
+    history = []
+    for status in STATUS_FLOW[:steps]:
+        ts += timedelta(minutes=rng.randint(1, 600))
+        history.append({
+            "status": status,
+            "timestamp": ts.isoformat(),
+            "actor": "bench",
+            "reason": f"Synthetic transition to {status}",
+        })
+    return history
+
+
+def work_item(rng, record_id, sprint_id, start, siblings, **extra) -> dict:
+    history = status_history(rng, start)
+    deps = rng.sample(siblings, k=min(len(siblings), rng.randint(0, 2)))
+    record = {"id": record_id}
+    record.update(extra)
+    record.update({
+        "title": f"Synthetic item {record_id}",
+        "sprint": sprint_id,
+        "status": history[-1]["status"],
+        "created_at": start.isoformat(),
+        "updated_at": history[-1]["timestamp"],
+        "depends_on": deps,
+        "mlflow_run_id": "",
+        "status_history": history,
+    })
+    return record
+
+
+def generate_dataset(root: Path, num_tasks: int, seed: int = 42) -> dict:
+    """Write sprints/issues/tasks JSONL under root/data; return record counts.
+
+    Identifier patterns cap the shape at 100 sprints x 100 issues x 100 tasks,
+    so tasks per issue grows with the requested scale.
+    """
+    rng = random.Random(seed)
+    tasks_per_issue = max(10, math.ceil(num_tasks / 10_000))
+    num_issues = math.ceil(num_tasks / tasks_per_issue)
+    num_sprints = math.ceil(num_issues / 100)
+    base = datetime(2026, 1, 5, tzinfo=timezone.utc)
+
+    data_dir = root / "data"
+    data_dir.mkdir(parents=True, exist_ok=True)
+    counts = {"sprints": 0, "issues": 0, "tasks": 0}
+
+    with open(data_dir / "sprints.jsonl", "w") as fs, \
+         open(data_dir / "issues.jsonl", "w") as fi, \
+         open(data_dir / "tasks.jsonl", "w") as ft:
+        for s in range(num_sprints):
+            sprint_id = f"S{s:02d}"
+            start = base + timedelta(days=7 * s)
+            status = "active" if s == num_sprints - 1 else "closed"
+            sprint = {
+                "id": sprint_id,
+                "name": f"Sprint {s:02d}",
+                "start_date": start.isoformat(),
+                "end_date": (start + timedelta(days=6)).isoformat(),
+                "status": status,
+                "notes": "",
+                "status_history": [{
+                    "status": status,
+                    "timestamp": start.isoformat(),
+                    "actor": "system",
+                    "reason": "Synthetic sprint",
+                }],
+            }
+            fs.write(json.dumps(sprint, separators=(",", ":")) + "\n")
+            counts["sprints"] += 1
+
+            issue_ids = []
+            for i in range(min(100, num_issues - s * 100)):
+                issue_id = f"{sprint_id}.I{i:02d}"
+                issue = work_item(rng, issue_id, sprint_id, start, issue_ids)
+                fi.write(json.dumps(issue, separators=(",", ":")) + "\n")
+                issue_ids.append(issue_id)
+                counts["issues"] += 1
+
+                task_ids = []
+                remaining = num_tasks - counts["tasks"]
+                for t in range(min(tasks_per_issue, remaining)):
+                    task_id = f"{issue_id}.T{t:02d}"
+                    task = work_item(rng, task_id, sprint_id, start, task_ids, issue_id=issue_id)
+                    ft.write(json.dumps(task, separators=(",", ":")) + "\n")
+                    task_ids.append(task_id)
+                    counts["tasks"] += 1
+
+    return counts
+
+
+def update_batch_lines(tasks: list, size: int = UPDATE_BATCH_SIZE) -> list:
+    """Batch-file lines that advance unfinished tasks one legal step."""
+    lines = []
+    for task in tasks:
+        if task["status"] == "done":
+            continue
+        next_status = STATUS_FLOW[STATUS_FLOW.index(task["status"]) + 1]
+        lines.append(f'task {task["id"]} {next_status} bench "Synthetic update"')
+        if len(lines) >= size:
+            break
+    return lines
+
+
+# === Stages ===
+def registry_path() -> Path:
+    import jsonl_to_parquet
+    path = REPO_ROOT / jsonl_to_parquet.REGISTRY_PATH
+    return path if path.exists() else REPO_ROOT / "governance" / "schema_registry.json"
+
+
+def stage_validate(ctx: dict):
+    import jsonl_to_parquet as v
+    with open(ctx["registry_path"]) as f:
+        registry = json.load(f)
+    frames = {name: v.load_jsonl(Path("data") / f"{name}.jsonl") for name in v.DATASETS}
+    lookup = {name: {"id": set(df["id"])} for name, df in frames.items()}
+    found = v.validate_all(frames, lookup, registry)
+    errors = sum(len(x) for x in found.values())
+    if errors:
+        raise RuntimeError(f"Synthetic data failed validation with {errors} violation(s)")
+
+
+def stage_metrics(ctx: dict):
+    import extract_metrics
+    ctx["metrics"] = extract_metrics.compute_metrics(*ctx["frames"])
+
+
+def stage_kanban(ctx: dict):
+    import generate_kanban
+    generate_kanban.render_board("Sprint Kanban", ctx["issues"], ctx["tasks"], None)
+
+
+def stage_timeseries(ctx: dict):
+    import build_timeseries
+    build_timeseries.collect_all_metrics()
+
+
+def stage_update(ctx: dict):
+    import event_log
+    import update_status
+    with open(ctx["registry_path"]) as f:
+        transitions = json.load(f)["workflow"]["allowed_transitions"]
+    updates = [update_status.parse_line(line) for line in ctx["update_lines"]]
+    task_map = {r["id"]: r for r in ctx["tasks"]}
+    # Work on copies so repeated passes start from the same state
+    for u in updates:
+        rec = task_map[u["id"]]
+        task_map[u["id"]] = dict(rec, status_history=list(rec["status_history"]))
+    for u in updates:
+        rec = task_map[u["id"]]
+        if u["status"] not in transitions.get(rec["status"], []):
+            raise RuntimeError(f"Illegal synthetic transition for {u['id']}")
+    for u in updates:
+        update_status.update_status(task_map[u["id"]], u["status"], u["actor"], u["reason"])
+
+    # Commit a batch planned against the current records, so repeated
+    # passes keep advancing tasks instead of conflicting
+    current = event_log.load_current_records("task", [u["id"] for u in updates])
+    lines = update_batch_lines([current[rid] for rid in sorted(current)])
+    if lines:
+        events, expected = update_status.plan_transitions(
+            [update_status.parse_line(line) for line in lines], transitions)
+        event_log.submit(events, expected)
+
+
+STAGES = {
+    "validate": stage_validate,
+    "metrics": stage_metrics,
+    "kanban": stage_kanban,
+    "timeseries": stage_timeseries,
+    "update": stage_update,
+}
+
+
+def prepare_context(root: Path) -> dict:
+    """Load inputs shared by several stages, outside the timed region."""
+    import event_log
+    import extract_metrics
+    import generate_kanban
+
+    ctx = {"registry_path": registry_path()}
+    ctx["frames"] = extract_metrics.load_canonical()
+    ctx["issues"] = generate_kanban.load_jsonl(Path("data") / "issues.jsonl")
+    ctx["tasks"] = generate_kanban.load_jsonl(Path("data") / "tasks.jsonl")
+    ctx["update_lines"] = update_batch_lines(ctx["tasks"])
+
+    # Build the byte-offset index and Merkle trees up front; the update
+    # stage times the incremental commit, not the first build
+    for entity in event_log.CANONICAL_FILES:
+        event_log.current_root(entity)
+    event_log.load_current_records("task", [ctx["tasks"][0]["id"]])
+
+    metrics = extract_metrics.compute_metrics(*ctx["frames"])
+    sprint_ids = sorted(ctx["frames"][0]["id"])[-3:]
+    for sprint_id in sprint_ids:
+        metrics_dir = root / "reports" / sprint_id / "metrics"
+        metrics_dir.mkdir(parents=True, exist_ok=True)
+        for n in range(METRICS_FILES_PER_SPRINT):
+            extract_metrics.write_json(metrics, metrics_dir / f"metrics-20260101-0000{n:02d}.json")
+    return ctx
+
+
+def measure(fn, ctx: dict, memory: bool) -> dict:
+    start = time.perf_counter()
+    fn(ctx)
+    result = {"seconds": round(time.perf_counter() - start, 4)}
+
+    if memory:
+        tracemalloc.start()
+        fn(ctx)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        result["peak_mb"] = round(peak / 2**20, 2)
+    return result
+
+
+def run_scale(label: str, num_tasks: int, stages: list, memory: bool) -> dict:
+    cwd = os.getcwd()
+    with tempfile.TemporaryDirectory(prefix=f"ke-bench-{label}-") as tmp:
+        root = Path(tmp)
+        gen_start = time.perf_counter()
+        counts = generate_dataset(root, num_tasks)
+        print(f"[{label}] generated {counts} in {time.perf_counter() - gen_start:.1f}s")
+
+        os.chdir(root)
+        try:
+            ctx = prepare_context(root)
+            results = {"records": counts}
+            for name in stages:
+                results[name] = measure(STAGES[name], ctx, memory)
+                print(f"[{label}] {name:<10} {results[name]}")
+        finally:
+            os.chdir(cwd)
+    return results
+
+
+def measure_startup(repeats: int = STARTUP_REPEATS) -> dict:
+    """Median wall time of `python scripts/<script> --help`, in milliseconds."""
+    results = {}
+    for script in STARTUP_SCRIPTS:
+        samples = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            subprocess.run(
+                [sys.executable, str(SCRIPTS_DIR / script), "--help"],
+                cwd=REPO_ROOT, stdout=subprocess.DEVNULL, check=True,
+            )
+            samples.append(time.perf_counter() - start)
+        results[script] = {"median_ms": round(statistics.median(samples) * 1000, 1)}
+        print(f"[startup] {script:<20} {results[script]}")
+    return results
+
+
+# === Golden Output ===
+def golden_metrics() -> dict:
+    """compute_metrics over the golden fixture, as written to JSON, minus
+    the volatile fields."""
+    import extract_metrics
+    frames = [extract_metrics.load_jsonl(GOLDEN_DIR / f"{name}.jsonl")
+              for name in ("sprints", "issues", "tasks")]
+    metrics = json.loads(json.dumps(extract_metrics.compute_metrics(*frames)))
+    return {key: value for key, value in metrics.items() if key not in VOLATILE_METRICS}
+
+
+def check_golden() -> list:
+    """Return the top-level metrics whose output differs from the golden file."""
+    with open(GOLDEN_METRICS_PATH) as f:
+        expected = json.load(f)
+    actual = golden_metrics()
+    return [f"golden/metrics {key}: output differs from {GOLDEN_METRICS_PATH.name}"
+            for key in sorted(expected.keys() | actual.keys())
+            if expected.get(key) != actual.get(key)]
+
+
+def check_golden_merkle() -> list:
+    """Build the Merkle store over the golden tasks and check that it keeps
+    the last record of a repeated id and verifies every record."""
+    import merkle
+    with open(GOLDEN_DIR / "tasks.jsonl") as f:
+        records = [json.loads(line) for line in f if line.strip()]
+    latest = {r["id"]: r for r in records}
+    problems = []
+    if len(latest) == len(records):
+        problems.append("golden/tasks.jsonl: fixture no longer repeats an id")
+    with tempfile.TemporaryDirectory(prefix="ke-golden-") as tmp:
+        path = Path(tmp) / "tasks.jsonl"
+        shutil.copy(GOLDEN_DIR / "tasks.jsonl", path)
+        stored = merkle.ensure(path, lambda: records)
+        expected, _ = merkle.build(list(latest.values()))
+        if stored != merkle.root(expected):
+            problems.append("golden/merkle: stored root differs from a keep-last build")
+        bad = merkle.verify_records(path, latest)
+        if bad:
+            problems.append(f"golden/merkle: {len(bad)} record(s) fail verification")
+    return problems
+
+
+# === Baselines ===
+def compare(current: dict, baseline: dict, tolerance: float) -> list:
+    """Return human-readable regressions of current versus baseline."""
+    regressions = []
+    for script, result in current.get("startup", {}).items():
+        budget = STARTUP_BUDGET_MS.get(script)
+        if budget is not None and result["median_ms"] > budget:
+            regressions.append(f"startup/{script}: {result['median_ms']} ms > {budget} ms budget")
+    for scale, stages in current["results"].items():
+        base_stages = baseline.get("results", {}).get(scale, {})
+        for stage, result in stages.items():
+            base = base_stages.get(stage)
+            if stage == "records" or not base:
+                continue
+            for key in ("seconds", "peak_mb"):
+                if key in result and key in base and base[key] > 0:
+                    ratio = result[key] / base[key]
+                    noise = key == "seconds" and result[key] - base[key] < MIN_REGRESSION_SECONDS
+                    if ratio > tolerance and not noise:
+                        regressions.append(
+                            f"{scale}/{stage} {key}: {base[key]} → {result[key]} ({ratio:.2f}x)"
+                        )
+    return regressions
+
+
+def write_json(payload: dict, path: Path):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(payload, f, indent=2)
+
+
+# === Main Orchestration ===
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--scales", default="1k,100k,1m",
+                        help=f"Comma-separated scales from {list(SCALES)}.")
+    parser.add_argument("--stages", default=",".join(STAGES),
+                        help=f"Comma-separated stages from {list(STAGES)}.")
+    parser.add_argument("--no-memory", action="store_true",
+                        help="Skip the tracemalloc pass (timings only).")
+    parser.add_argument("--no-startup", action="store_true",
+                        help="Skip the CLI startup measurements.")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="Store this run as the regression baseline.")
+    parser.add_argument("--compare", action="store_true",
+                        help="Fail if any stage regresses against the baseline.")
+    parser.add_argument("--tolerance", type=float, default=1.25,
+                        help="Allowed slowdown/memory ratio before --compare fails.")
+    parser.add_argument("--update-golden", action="store_true",
+                        help="Rewrite golden/metrics.json from the current compute_metrics.")
+    args = parser.parse_args()
+
+    scales = [s.strip() for s in args.scales.split(",") if s.strip()]
+    stages = [s.strip() for s in args.stages.split(",") if s.strip()]
+    unknown = [s for s in scales if s not in SCALES] + [s for s in stages if s not in STAGES]
+    if unknown:
+        raise SystemExit(f"ERROR: Unknown scale or stage: {unknown}")
+
+    if args.update_golden:
+        write_json(golden_metrics(), GOLDEN_METRICS_PATH)
+        print(f"Golden metrics written to {GOLDEN_METRICS_PATH}")
+    mismatches = check_golden() + check_golden_merkle()
+    if mismatches:
+        print("Output regressions:")
+        for m in mismatches:
+            print(f"- {m}")
+        sys.exit(1)
+    print("[golden] compute_metrics output and Merkle store match")
+
+    run = {
+        "generated_at": datetime.now().isoformat(),
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": {},
+    }
+    if not args.no_startup:
+        run["startup"] = measure_startup()
+    for label in scales:
+        run["results"][label] = run_scale(label, SCALES[label], stages, not args.no_memory)
+
+    write_json(run, LATEST_PATH)
+    print(f"Benchmark results written to {LATEST_PATH}")
+
+    if args.save_baseline:
+        write_json(run, BASELINE_PATH)
+        print(f"Baseline saved to {BASELINE_PATH}")
+
+    if args.compare:
+        if not BASELINE_PATH.exists():
+            write_json(run, BASELINE_PATH)
+            print(f"No baseline yet; this run saved to {BASELINE_PATH}")
+            return
+        with open(BASELINE_PATH) as f:
+            baseline = json.load(f)
+        regressions = compare(run, baseline, args.tolerance)
+        if regressions:
+            print("Performance regressions:")
+            for r in regressions:
+                print(f"- {r}")
+            sys.exit(1)
+        print("No regressions against baseline.")
+
+
+if __name__ == "__main__":
+    main()
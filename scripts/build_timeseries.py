@@ -2,13 +2,33 @@
 """
 build_timeseries.py — Consolidate Metrics into a Time-Series Dataset (T03)
 
-This script scans all sprint metrics directories, loads each metrics JSON file,
-extracts scalar and semi-structured fields, flattens them into a tabular format,
-and writes a consolidated time-series dataset in both JSONL and Parquet formats.
+This script lists all sprint metrics files through the artifact catalog
+(catalog.py), loads each metrics JSON file, extracts scalar and
+semi-structured fields, flattens them into a tabular format, and writes a
+consolidated time-series dataset in both JSONL and Parquet formats.
+
+The JSONL holds one flattened record per metrics file. The Parquet copy is
+long/narrow: one row per data point, (timestamp, sprint_id, metric, key,
+value, text), with sprint_id, metric and key dictionary-encoded. Its width
+is fixed and its size follows the number of data points, however many
+issues have ever existed. pivot_wide() turns long rows back into one
+column per metric/key, and read_timeseries() reads selected metrics only.
+
+Builds are incremental. A manifest records every ingested file by path,
+size and SHA-256, so each run flattens only new metrics files, appends
+their rows to the JSONL and writes them as one new Parquet fragment. It
+also records the byte range of each sprint's rows in the JSONL, which
+generate-review.py uses to read only the end of the sprint's range.
+Fragments are compacted into one (and the JSONL re-sorted) with
+--compact, automatically once MAX_FRAGMENTS accumulate, or when new rows
+arrive out of timestamp order.
+A metrics file that changed or disappeared since it was ingested
+triggers a full rebuild, as does --rebuild.
 
 Outputs (canonical):
     data/metrics_timeseries.jsonl
-    data/metrics_timeseries.parquet
+    data/metrics_timeseries.parquet/part-*.parquet
+    data/.metrics_timeseries.manifest.json
 
 This dataset supports:
     - sprint reviews
@@ -18,27 +38,59 @@ This dataset supports:
     - forecasting and anomaly detection
 """
 
+import argparse
+import hashlib
 import json
+import os
+import shutil
+import time
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from datetime import datetime
 
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+import catalog
+import event_log
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib json is the fallback
+    orjson = None
 
 
 # === Paths ===
-REPORTS_DIR = Path("reports")
 DATA_DIR = Path("data")
 
 JSONL_OUT = DATA_DIR / "metrics_timeseries.jsonl"
 PARQUET_OUT = DATA_DIR / "metrics_timeseries.parquet"
+MANIFEST_PATH = DATA_DIR / ".metrics_timeseries.manifest.json"
+
+MANIFEST_VERSION = 4
+MAX_FRAGMENTS = 32
+
+# Metrics files are small, so loading them is dominated by per-file open/read
+# latency; threads overlap it (file reads and hashing release the GIL)
+DEFAULT_JOBS = min(32, (os.cpu_count() or 1) * 4)
 
 
 # === Helper Functions ===
 
+def json_loads(data: bytes):
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass  # e.g. NaN, which orjson rejects and json accepts
+    return json.loads(data)
+
 def load_metrics_file(path: Path) -> dict:
     """Load a single metrics JSON file."""
-    with open(path, "r") as f:
-        return json.load(f)
+    with open(path, "rb") as f:
+        return json_loads(f.read())
 
 
 def flatten_metrics(metrics: dict, sprint_id: str) -> dict:
@@ -78,53 +130,373 @@ def flatten_metrics(metrics: dict, sprint_id: str) -> dict:
     return flat
 
 
-def collect_all_metrics() -> pd.DataFrame:
-    """
-    Walk through reports/<sprint>/metrics directories and collect all metrics files.
-    Returns a pandas DataFrame representing the consolidated time-series.
-    """
-    rows = []
+def metrics_files() -> list:
+    """(sprint_id, path) for every metrics file registered in the artifact catalog."""
+    return [(row["sprint"], row["path"]) for row in catalog.find("metrics")]
 
-    for sprint_dir in REPORTS_DIR.iterdir():
-        if not sprint_dir.is_dir():
-            continue
 
-        sprint_id = sprint_dir.name
-        metrics_dir = sprint_dir / "metrics"
+def read_metrics_file(path: Path) -> tuple:
+    """(manifest entry, parsed metrics) from a single read of the file."""
+    stat = path.stat()
+    with open(path, "rb") as f:
+        data = f.read()
+    entry = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "sha256": hashlib.sha256(data).hexdigest()}
+    return entry, json_loads(data)
 
-        if not metrics_dir.exists():
-            continue
 
-        for metrics_file in metrics_dir.glob("metrics-*.json"):
-            metrics = load_metrics_file(metrics_file)
-            flat = flatten_metrics(metrics, sprint_id)
-            rows.append(flat)
+def read_metrics_files(paths: list, jobs: int = DEFAULT_JOBS) -> list:
+    """read_metrics_file over paths in a thread pool; results keep the input order."""
+    if not paths:
+        return []
+    started = time.perf_counter()
+    if jobs <= 1:
+        results = [read_metrics_file(path) for path in paths]
+    else:
+        with ThreadPoolExecutor(max_workers=jobs) as pool:
+            results = list(pool.map(read_metrics_file, paths))
+    elapsed = time.perf_counter() - started
+    rate = len(paths) / elapsed if elapsed > 0 else float("inf")
+    decoder = "orjson" if orjson is not None else "json"
+    print(f"Loaded {len(paths)} metrics files in {elapsed:.2f}s ({rate:,.0f} files/s, {jobs} jobs, {decoder})")
+    return results
 
-    if not rows:
+
+def timestamps(rows: list) -> pd.Series:
+    return pd.to_datetime(pd.Series([row.get("timestamp") for row in rows], dtype=object), format="ISO8601")
+
+
+def sort_records(rows: list) -> list:
+    """Flattened rows in chronological order (stable)."""
+    order = timestamps(rows).sort_values(kind="stable", na_position="last").index
+    return [rows[i] for i in order]
+
+
+def to_frame(rows: list) -> pd.DataFrame:
+    """Flattened rows as a chronologically sorted DataFrame."""
+    df = pd.DataFrame(rows)
+    if not df.empty:
+        df["timestamp"] = pd.to_datetime(df["timestamp"], format="ISO8601")
+        df = df.sort_values("timestamp", kind="stable")
+    return df
+
+
+def collect_metrics(files: list, jobs: int = DEFAULT_JOBS) -> pd.DataFrame:
+    """Flatten the given (sprint_id, path) metrics files into a chronologically sorted DataFrame."""
+    loaded = read_metrics_files([path for _, path in files], jobs)
+    return to_frame([flatten_metrics(metrics, sprint_id) for (sprint_id, _), (_, metrics) in zip(files, loaded)])
+
+
+def collect_all_metrics(jobs: int = DEFAULT_JOBS) -> pd.DataFrame:
+    """
+    Collect every reports/<sprint>/metrics file listed in the artifact catalog.
+    Returns a pandas DataFrame representing the consolidated time-series.
+    """
+    files = metrics_files()
+    if not files:
         raise RuntimeError("No metrics files found in reports/*/metrics/")
+    return collect_metrics(files, jobs)
+
+
+# === Long Format ===
+
+LONG_SCHEMA = pa.schema([
+    ("timestamp", pa.timestamp("us")),
+    ("sprint_id", pa.dictionary(pa.int32(), pa.string())),
+    ("metric", pa.dictionary(pa.int32(), pa.string())),
+    ("key", pa.dictionary(pa.int32(), pa.string())),
+    ("value", pa.float64()),
+    ("text", pa.string()),
+])
+KEY_SEP = "/"
+
+
+def data_points(metric: str, key: str, value):
+    """(metric, key, value, text) for one flattened value. Nested dicts
+    extend the key with KEY_SEP, lists count as `<key>_count`, strings go to
+    text and missing values are dropped."""
+    if value is None:
+        return
+    if isinstance(value, dict):
+        for subkey, subval in value.items():
+            yield from data_points(metric, f"{key}{KEY_SEP}{subkey}" if key else str(subkey), subval)
+    elif isinstance(value, list):
+        yield metric, f"{key}_count" if key else "count", float(len(value)), None
+    elif isinstance(value, (int, float)):
+        yield metric, key, float(value), None
+    else:
+        yield metric, key, None, str(value)
+
+
+def long_table(rows: list) -> pa.Table:
+    """Flattened rows as one long table: a column `a__b` becomes metric `a`,
+    key `b`; an unprefixed column has key ""."""
+    points, counts = [], []
+    for row in rows:
+        start = len(points)
+        for column, value in row.items():
+            if column in ("timestamp", "sprint_id"):
+                continue
+            metric, _, key = column.partition("__")
+            if isinstance(value, (int, float)):  # fast path for the common case
+                points.append((metric, key, float(value), None))
+            else:
+                points.extend(data_points(metric, key, value))
+        counts.append(len(points) - start)
+
+    metric, key, value, text = zip(*points) if points else ([], [], [], [])
+    return pa.table({
+        "timestamp": timestamps(rows).repeat(counts).to_numpy(),
+        "sprint_id": np.repeat(np.array([row.get("sprint_id") for row in rows], dtype=object), counts),
+        "metric": metric,
+        "key": key,
+        "value": value,
+        "text": text,
+    }).cast(LONG_SCHEMA)
+
+
+def pivot_wide(long: pd.DataFrame) -> pd.DataFrame:
+    """Wide view of long rows: one row per (timestamp, sprint_id), one column
+    per metric (`metric` or `metric__key`), like flatten_metrics produces."""
+    metric = long["metric"].astype(str)
+    key = long["key"].astype(str)
+    points = pd.DataFrame({
+        "timestamp": long["timestamp"],
+        "sprint_id": long["sprint_id"].astype(str),
+        "column": metric.where(key == "", metric + "__" + key),
+        "value": long["value"],
+        "text": long["text"],
+    }).drop_duplicates(["timestamp", "sprint_id", "column"], keep="last")
+
+    index = ["timestamp", "sprint_id", "column"]
+    wide = points.set_index(index)["value"].unstack("column")
+    text = points[points["text"].notna()]
+    if not text.empty:
+        text = text.set_index(index)["text"].unstack("column")
+        wide = wide.drop(columns=text.columns).join(text)
+    wide.columns.name = None
+    return wide.reset_index()
+
+
+def read_timeseries(metrics: list = None, sprints: list = None, wide: bool = False) -> pd.DataFrame:
+    """Read the long Parquet time-series, optionally only some metrics and
+    sprints (filters are pushed down to the scan), pivoted with wide=True."""
+    dataset = ds.dataset(PARQUET_OUT, format="parquet", schema=LONG_SCHEMA)
+    condition = None
+    if metrics is not None:
+        condition = ds.field("metric").isin(metrics)
+    if sprints is not None:
+        sprint_filter = ds.field("sprint_id").isin(sprints)
+        condition = sprint_filter if condition is None else condition & sprint_filter
+    long = dataset.to_table(filter=condition).to_pandas()
+    return pivot_wide(long) if wide else long
+
+
+# === Ingestion Manifest ===
+
+def load_manifest() -> dict:
+    """The manifest, or None if it is missing, unreadable, from another
+    version, or its outputs are gone or do not match it.
+
+    The JSONL is written after the manifest, so a build interrupted in
+    between leaves a JSONL whose size differs from the recorded one.
+    """
+    if not MANIFEST_PATH.exists() or not JSONL_OUT.exists() or not PARQUET_OUT.is_dir():
+        return None
+    try:
+        with open(MANIFEST_PATH, "r") as f:
+            manifest = json.load(f)
+    except ValueError:
+        return None
+    if manifest.get("version") != MANIFEST_VERSION:
+        return None
+    return manifest if JSONL_OUT.stat().st_size == manifest["jsonl_size"] else None
+
+
+def save_manifest(manifest: dict):
+    event_log.write_atomic(MANIFEST_PATH, json.dumps(manifest, indent=2))
+
+
+def remove_orphaned_fragments(manifest: dict):
+    """Delete fragments the manifest does not list (written by a build
+    interrupted before its manifest was saved); read_timeseries() reads
+    every fragment in the directory."""
+    listed = set(manifest["fragments"])
+    for path in PARQUET_OUT.glob("part-*.parquet"):
+        if path.name not in listed:
+            path.unlink()
+
+
+def scan(manifest: dict, jobs: int = DEFAULT_JOBS):
+    """Compare reports/ against the manifest.
+
+    Files whose size and mtime match their manifest entry are not read.
+    Every other file is read (in parallel) exactly once, for both its hash
+    and its contents.
+
+    Returns (files, entries, loaded, stale): every current (sprint_id, path),
+    their manifest entries, {path: metrics} for the files that were read,
+    and whether an ingested file has since changed or disappeared.
+    """
+    ingested = manifest["files"] if manifest else {}
+    files = metrics_files()
+    entries, to_read = {}, []
+    for sprint_id, path in files:
+        key = str(path)
+        previous = ingested.get(key)
+        stat = path.stat()
+        if previous and previous["size"] == stat.st_size and previous["mtime_ns"] == stat.st_mtime_ns:
+            entries[key] = previous
+        else:
+            to_read.append(path)
 
-    return pd.DataFrame(rows)
+    loaded = {}
+    for path, (entry, metrics) in zip(to_read, read_metrics_files(to_read, jobs)):
+        entries[str(path)] = entry
+        loaded[str(path)] = metrics
 
+    stale = any(key in ingested and entries[key]["sha256"] != ingested[key]["sha256"] for key in loaded)
+    stale = stale or any(key not in entries for key in ingested)
+    return files, entries, loaded, stale
 
-# === Main Orchestration ===
 
-def main():
-    df = collect_all_metrics()
+# === Writers ===
+
+def fragment_path(n: int) -> Path:
+    return PARQUET_OUT / f"part-{n:05d}.parquet"
 
-    # Sort chronologically
-    df["timestamp"] = pd.to_datetime(df["timestamp"])
-    df = df.sort_values("timestamp")
 
-    # Ensure data directory exists
+def encode_jsonl(rows: list, offset: int = 0, ranges: dict = None) -> tuple:
+    """JSONL bytes for rows written at offset, and ranges updated with the
+    [start, end) byte range of each sprint's rows ({sprint_id: [start, end]})."""
+    ranges = {} if ranges is None else ranges
+    lines = []
+    for row in rows:
+        line = (json.dumps(row, default=str) + "\n").encode()
+        span = ranges.setdefault(row["sprint_id"], [offset, offset])
+        offset += len(line)
+        span[1] = offset
+        lines.append(line)
+    return b"".join(lines), ranges
+
+
+def write_full(rows: list, entries: dict) -> dict:
+    """Rewrite both outputs from rows (one Parquet fragment) and return the new manifest."""
     DATA_DIR.mkdir(parents=True, exist_ok=True)
+    # Until the new manifest is saved, an interrupted build rebuilds from scratch
+    MANIFEST_PATH.unlink(missing_ok=True)
 
     # Write JSONL
-    df.to_json(JSONL_OUT, orient="records", lines=True)
+    data, ranges = encode_jsonl(rows)
+    tmp_path = JSONL_OUT.with_name(JSONL_OUT.name + ".tmp")
+    tmp_path.write_bytes(data)
+    tmp_path.replace(JSONL_OUT)
+
+    # Write Parquet (earlier builds wrote a single file at this path)
+    if PARQUET_OUT.is_dir():
+        shutil.rmtree(PARQUET_OUT)
+    elif PARQUET_OUT.exists():
+        PARQUET_OUT.unlink()
+    PARQUET_OUT.mkdir()
+    pq.write_table(long_table(rows), fragment_path(0))
+
+    return {
+        "version": MANIFEST_VERSION,
+        "files": entries,
+        "fragments": [fragment_path(0).name],
+        "last_timestamp": timestamps(rows).max().isoformat(),
+        "jsonl_size": len(data),
+        "sprints": ranges,
+    }
+
+
+def append(rows: list, manifest: dict, entries: dict):
+    """Append new rows as one new Parquet fragment and to the JSONL.
+
+    The fragment is written first, then the manifest that lists it and the
+    JSONL's new size, then the JSONL. An interruption before the manifest
+    leaves an unlisted fragment (removed by the next build); one after it
+    leaves a JSONL of the wrong size (rebuilt by the next build).
+    """
+    n = int(manifest["fragments"][-1][len("part-"):-len(".parquet")]) + 1
+    pq.write_table(long_table(rows), fragment_path(n))
+
+    data, _ = encode_jsonl(rows, manifest["jsonl_size"], manifest["sprints"])
+    manifest["files"] = entries
+    manifest["fragments"].append(fragment_path(n).name)
+    manifest["last_timestamp"] = timestamps(rows).max().isoformat()
+    manifest["jsonl_size"] += len(data)
+    save_manifest(manifest)
+
+    with open(JSONL_OUT, "ab") as f:
+        f.write(data)
 
-    # Write Parquet
-    df.to_parquet(PARQUET_OUT, index=False)
 
-    print(f"Time-series written to:\n  {JSONL_OUT}\n  {PARQUET_OUT}")
+def load_jsonl() -> list:
+    """Read the flattened records back from the JSONL."""
+    rows = []
+    with open(JSONL_OUT, "rb") as f:
+        for line in f:
+            if line.strip():
+                rows.append(json_loads(line))
+    return rows
+
+
+# === Build ===
+
+def build(rebuild: bool = False, compact: bool = False, jobs: int = DEFAULT_JOBS) -> str:
+    """Bring the outputs up to date; returns what was done."""
+    if rebuild:
+        catalog.rescan(["metrics"])
+    manifest = None if rebuild else load_manifest()
+    if manifest is not None:
+        remove_orphaned_fragments(manifest)
+    files, entries, loaded, stale = scan(manifest, jobs)
+    if not entries:
+        raise RuntimeError("No metrics files found in reports/*/metrics/")
+
+    if manifest is None or stale:
+        rest = [path for _, path in files if str(path) not in loaded]
+        for path, (_, metrics) in zip(rest, read_metrics_files(rest, jobs)):
+            loaded[str(path)] = metrics
+        rows = sort_records([flatten_metrics(loaded[str(path)], sprint_id) for sprint_id, path in files])
+        save_manifest(write_full(rows, entries))
+        return f"rebuilt from {len(entries)} metrics files"
+
+    new_files = [(sprint_id, path) for sprint_id, path in files if str(path) not in manifest["files"]]
+    rows = sort_records([flatten_metrics(loaded[str(path)], sprint_id) for sprint_id, path in new_files])
+
+    # Out-of-order rows would break the JSONL's chronological order
+    out_of_order = bool(rows) and timestamps(rows).min() < pd.Timestamp(manifest["last_timestamp"])
+    if compact or out_of_order or (rows and len(manifest["fragments"]) >= MAX_FRAGMENTS):
+        merged = sort_records(load_jsonl() + rows)
+        save_manifest(write_full(merged, entries))
+        return f"compacted {len(merged)} rows ({len(new_files)} new files)"
+
+    if not rows:
+        if entries != manifest["files"]:
+            manifest["files"] = entries
+            save_manifest(manifest)
+        return "up to date"
+
+    append(rows, manifest, entries)
+    return f"appended {len(rows)} rows as {manifest['fragments'][-1]}"
+
+
+# === Main Orchestration ===
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--compact", action="store_true",
+                        help="Merge all Parquet fragments into one and re-sort the JSONL.")
+    parser.add_argument("--rebuild", action="store_true",
+                        help="Ignore the manifest, rescan reports/ and re-ingest every metrics file.")
+    parser.add_argument("--jobs", type=int, default=DEFAULT_JOBS,
+                        help=f"Threads for reading metrics files (default: {DEFAULT_JOBS}).")
+    args = parser.parse_args()
+
+    status = build(rebuild=args.rebuild, compact=args.compact, jobs=args.jobs)
+
+    print(f"Time-series {status}:\n  {JSONL_OUT}\n  {PARQUET_OUT}")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+catalog.py — SQLite index of generated artifacts
+
+Every script that writes a report artifact registers it here, in
+data/.catalog.sqlite, with its sprint, kind, timestamp, path, size and
+SHA-256. Consumers ask indexed questions such as "latest metrics for
+sprint-05" or "today's minutes" instead of globbing and sorting
+directories.
+
+Kinds, and where their files live:
+    metrics         reports/<sprint>/metrics/metrics-YYYYMMDD-HHMMSS.json
+    flow            reports/<sprint>/flow/flow-YYYYMMDD-HHMMSS.json
+    review          reports/<sprint>/review/review-YYYYMMDD-HHMMSS.json
+    review_md       reports/<sprint>/review/review-YYYYMMDD-HHMMSS.md
+    minutes         reports/<sprint>/minutes/YYYY-MM-DD.json
+    kanban          reports/<sprint>/kanban/current.md
+    kanban_history  reports/<sprint>/kanban/history/YYYY-MM-DD.md
+
+The timestamp comes from the file name. Cross-sprint outputs under data/,
+such as the metrics time series, are not catalogued; build_timeseries.py
+tracks its own inputs and outputs in its ingestion manifest.
+
+The catalog is a cache of the layout above, reconciled on every query:
+each query stats the kind's directory in every sprint and rescans those
+whose mtime changed since they were last scanned. The list of sprints is
+cached too and only re-read when the mtime of reports/ changes.
+Artifacts written before the catalog existed, pulled from git or copied
+in by hand are found without any extra step. Only new or resized files
+are hashed. Rows whose file has since disappeared are dropped. `--rescan`
+rehashes everything, for files edited in place.
+
+Usage:
+    python scripts/catalog.py                          # counts per kind and sprint
+    python scripts/catalog.py --latest metrics [--sprint sprint-05]
+    python scripts/catalog.py --list metrics [--sprint sprint-05]
+    python scripts/catalog.py --rescan
+"""
+
+import argparse
+import hashlib
+import re
+import sqlite3
+from contextlib import contextmanager
+from datetime import date, datetime, timedelta
+from pathlib import Path
+
+
+# === Paths ===
+REPORTS_DIR = Path("reports")
+CATALOG_PATH = Path("data") / ".catalog.sqlite"
+
+# kind -> glob under reports/<sprint>/
+KINDS = {
+    "metrics": "metrics/metrics-*.json",
+    "flow": "flow/flow-*.json",
+    "review": "review/review-*.json",
+    "review_md": "review/review-*.md",
+    "minutes": "minutes/????-??-??.json",
+    "kanban": "kanban/current.md",
+    "kanban_history": "kanban/history/????-??-??.md",
+}
+
+SCHEMA_VERSION = 3
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS artifacts (
+    path          TEXT PRIMARY KEY,
+    sprint        TEXT NOT NULL,
+    kind          TEXT NOT NULL,
+    timestamp     TEXT,
+    size          INTEGER NOT NULL,
+    sha256        TEXT NOT NULL,
+    registered_at TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS artifacts_kind_sprint_ts ON artifacts (kind, sprint, timestamp);
+CREATE INDEX IF NOT EXISTS artifacts_kind_ts ON artifacts (kind, timestamp);
+CREATE TABLE IF NOT EXISTS scanned (
+    kind     TEXT NOT NULL,
+    dir      TEXT NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    PRIMARY KEY (kind, dir)
+);
+CREATE TABLE IF NOT EXISTS sprints (
+    name TEXT PRIMARY KEY
+);
+"""
+
+STAMP_RE = re.compile(r"(\d{4})(\d{2})(\d{2})-(\d{2})(\d{2})(\d{2})")
+DAY_RE = re.compile(r"(\d{4})-(\d{2})-(\d{2})")
+
+
+# === Connection ===
+@contextmanager
+def connect():
+    """An open catalog, created on first use; commits when the block exits cleanly."""
+    CATALOG_PATH.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(CATALOG_PATH, timeout=30)
+    try:
+        if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            conn.executescript("DROP TABLE IF EXISTS artifacts; DROP TABLE IF EXISTS scanned; "
+                               "DROP TABLE IF EXISTS sprints;")
+            conn.executescript(SCHEMA)
+            conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+# === Registration ===
+def name_timestamp(path: Path):
+    """ISO timestamp (or date) encoded in an artifact's file name, if any."""
+    m = STAMP_RE.search(path.name)
+    if m:
+        y, mo, d, h, mi, s = m.groups()
+        return f"{y}-{mo}-{d}T{h}:{mi}:{s}"
+    m = DAY_RE.search(path.name)
+    return "-".join(m.groups()) if m else None
+
+
+def sha256_file(path: Path) -> str:
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def _register(conn, path: Path, kind: str, sprint: str):
+    conn.execute(
+        "INSERT OR REPLACE INTO artifacts VALUES (?, ?, ?, ?, ?, ?, ?)",
+        (path.as_posix(), sprint, kind, name_timestamp(path), path.stat().st_size,
+         sha256_file(path), datetime.now().isoformat()),
+    )
+
+
+def register(path, kind: str, sprint: str):
+    """Record (or refresh) an artifact a script has just written."""
+    if kind not in KINDS:
+        raise ValueError(f"Unknown artifact kind '{kind}' (choose from {list(KINDS)})")
+    with connect() as conn:
+        _register(conn, Path(path), kind, sprint)
+
+
+def _scan_dir(conn, kind: str, directory: Path, pattern: str, rehash: bool = False):
+    """Register the kind's files in one sprint directory and drop rows for
+    files that are gone. Files already registered at the same size are
+    skipped unless rehash is set."""
+    sprint = directory.relative_to(REPORTS_DIR).parts[0]
+    known = dict(conn.execute(
+        "SELECT path, size FROM artifacts WHERE kind = ? AND sprint = ?", (kind, sprint),
+    ).fetchall())
+    for path in sorted(directory.glob(pattern)):
+        size = known.pop(path.as_posix(), None)
+        if rehash or size != path.stat().st_size:
+            _register(conn, path, kind, sprint)
+    conn.executemany("DELETE FROM artifacts WHERE path = ?", [(path,) for path in known])
+
+
+def _sprints(conn) -> list:
+    """Sprint directory names under reports/, listed again only when the
+    mtime of reports/ changed (recorded in scanned with an empty kind)."""
+    if not REPORTS_DIR.exists():
+        return []
+    # Stat before listing, so a sprint added mid-listing triggers the next one
+    mtime_ns = REPORTS_DIR.stat().st_mtime_ns
+    key = REPORTS_DIR.as_posix()
+    row = conn.execute("SELECT mtime_ns FROM scanned WHERE kind = '' AND dir = ?", (key,)).fetchone()
+    if row is not None and row[0] == mtime_ns:
+        return [name for (name,) in conn.execute("SELECT name FROM sprints ORDER BY name")]
+    names = sorted(p.name for p in REPORTS_DIR.iterdir() if p.is_dir() and not p.name.startswith("."))
+    conn.execute("DELETE FROM sprints")
+    conn.executemany("INSERT INTO sprints VALUES (?)", [(name,) for name in names])
+    conn.execute("INSERT OR REPLACE INTO scanned VALUES ('', ?, ?)", (key, mtime_ns))
+    return names
+
+
+def _reconcile(conn, kind: str, rehash: bool = False):
+    """Rescan every sprint directory of a kind whose mtime changed since it
+    was last scanned (all of them with rehash).
+
+    Each sprint's directory is stat-ed directly; a file added to an existing
+    directory only changes that directory's mtime.
+    """
+    subdir, pattern = KINDS[kind].rsplit("/", 1)
+    scanned = dict(conn.execute("SELECT dir, mtime_ns FROM scanned WHERE kind = ?", (kind,)).fetchall())
+    present = set()
+    for sprint in _sprints(conn):
+        directory = REPORTS_DIR / sprint / subdir
+        key = directory.as_posix()
+        # Stat before scanning, so a file added mid-scan triggers the next rescan
+        try:
+            mtime_ns = directory.stat().st_mtime_ns
+        except (FileNotFoundError, NotADirectoryError):
+            continue
+        present.add(key)
+        if rehash or scanned.pop(key, None) != mtime_ns:
+            _scan_dir(conn, kind, directory, pattern, rehash)
+            conn.execute("INSERT OR REPLACE INTO scanned VALUES (?, ?, ?)", (kind, key, mtime_ns))
+    for key in scanned.keys() - present:
+        # Directory removed: forget it; its rows are pruned as queries meet them
+        conn.execute("DELETE FROM scanned WHERE kind = ? AND dir = ?", (kind, key))
+
+
+def rescan(kinds: list = None):
+    """Rehash every artifact on disk, for files edited in place."""
+    with connect() as conn:
+        for kind in kinds or KINDS:
+            _reconcile(conn, kind, rehash=True)
+
+
+# === Queries ===
+def _where(kind: str, sprint: str = None, day: str = None) -> tuple:
+    clauses, params = ["kind = ?"], [kind]
+    if sprint is not None:
+        clauses.append("sprint = ?")
+        params.append(sprint)
+    if day is not None:
+        next_day = (date.fromisoformat(day) + timedelta(days=1)).isoformat()
+        clauses.append("timestamp >= ? AND timestamp < ?")
+        params += [day, next_day]
+    return " AND ".join(clauses), params
+
+
+def find(kind: str, sprint: str = None, day: str = None) -> list:
+    """Artifacts of a kind (optionally one sprint's, or one day's), oldest
+    first, as dicts with path, sprint, timestamp, size and sha256."""
+    where, params = _where(kind, sprint, day)
+    with connect() as conn:
+        _reconcile(conn, kind)
+        rows = conn.execute(
+            f"SELECT path, sprint, timestamp, size, sha256 FROM artifacts WHERE {where} "
+            "ORDER BY timestamp, path", params,
+        ).fetchall()
+        found, missing = [], []
+        for path, row_sprint, timestamp, size, sha256 in rows:
+            if Path(path).exists():
+                found.append({"path": Path(path), "sprint": row_sprint, "timestamp": timestamp,
+                              "size": size, "sha256": sha256})
+            else:
+                missing.append((path,))
+        conn.executemany("DELETE FROM artifacts WHERE path = ?", missing)
+    return found
+
+
+def latest(kind: str, sprint: str = None, day: str = None):
+    """Path of the newest artifact of a kind (optionally for one sprint or day), or None."""
+    where, params = _where(kind, sprint, day)
+    with connect() as conn:
+        _reconcile(conn, kind)
+        for (path,) in conn.execute(
+            f"SELECT path FROM artifacts WHERE {where} ORDER BY timestamp DESC, path DESC", params,
+        ).fetchall():
+            if Path(path).exists():
+                return Path(path)
+            conn.execute("DELETE FROM artifacts WHERE path = ?", (path,))
+    return None
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rescan", action="store_true", help="Rehash every artifact found on disk.")
+    parser.add_argument("--latest", choices=list(KINDS), metavar="KIND", help="Print the newest artifact of a kind.")
+    parser.add_argument("--list", choices=list(KINDS), metavar="KIND", help="List artifacts of a kind, oldest first.")
+    parser.add_argument("--sprint", help="Only this sprint's artifacts.")
+    args = parser.parse_args()
+
+    if args.rescan:
+        rescan()
+    if args.latest:
+        path = latest(args.latest, args.sprint)
+        if path is None:
+            raise SystemExit(f"No {args.latest} artifacts found")
+        print(path)
+    elif args.list:
+        for row in find(args.list, args.sprint):
+            print(f"{row['timestamp']}  {row['sprint']}  {row['path']}")
+    else:
+        with connect() as conn:
+            for kind in KINDS:
+                _reconcile(conn, kind)
+            for kind, sprint, count in conn.execute(
+                "SELECT kind, sprint, COUNT(*) FROM artifacts GROUP BY kind, sprint ORDER BY kind, sprint"
+            ):
+                print(f"{kind:14} {sprint:12} {count}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+dependency_graph.py — Array-backed dependency graph over issues and tasks
+
+Builds one directed graph from every issue and task `depends_on` list
+(edge: dependency → dependent), stored as CSR arrays (indptr / indices)
+over record positions. Everything below runs in O(V + E):
+
+- topological_order()   Kahn's algorithm
+- cycles()              strongly connected components (iterative Tarjan)
+                        with more than one member, or a self-loop
+- critical_path()       longest dependency chain, over all items and over
+                        unfinished items only
+- blocked()             unfinished items with an unfinished direct dependency
+- transitively_blocked() unfinished items with an unfinished dependency
+                        anywhere upstream, or caught in / behind a cycle
+
+Dependencies on ids that do not exist are counted as dangling and
+otherwise ignored (the validator reports them). An id that occurs more
+than once keeps only its last record, the way a later line supersedes an
+earlier one; such ids are counted in duplicate_ids.
+
+Usage (prints a summary for the current data):
+    python scripts/dependency_graph.py
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+
+DONE_STATUS = "done"
+
+
+# === Graph ===
+class DependencyGraph:
+    def __init__(self, ids, statuses, depends_on):
+        ids = pd.Index(ids, dtype=object)
+        keep = ~ids.duplicated(keep="last")
+        self.duplicate_ids = int(ids[~keep].nunique())
+        # Input position of each node, so callers can map nodes back to their frames
+        self.positions = np.flatnonzero(keep)
+        self.ids = ids[keep]
+        n = len(self.ids)
+        self.done = np.asarray(statuses, dtype=object)[keep] == DONE_STATUS
+        if not keep.all():
+            depends_on = [depends_on[i] for i in self.positions.tolist()]
+
+        lengths = np.fromiter(
+            (len(d) if isinstance(d, (list, np.ndarray)) else 0 for d in depends_on),
+            dtype=np.int64, count=n,
+        )
+        targets = [dep for d in depends_on if isinstance(d, (list, np.ndarray)) for dep in d]
+        src = self.ids.get_indexer(pd.Index(targets, dtype=object)) if targets else np.empty(0, np.int64)
+        dst = np.repeat(np.arange(n), lengths)
+        known = src >= 0
+        self.dangling_edges = int((~known).sum())
+        self.src, self.dst = src[known], dst[known]
+
+        # CSR of successors
+        order = np.argsort(self.src, kind="stable")
+        self.indices = self.dst[order]
+        self.indptr = np.concatenate([[0], np.cumsum(np.bincount(self.src, minlength=n))])
+        self.indegree = np.bincount(self.dst, minlength=n)
+        self._succ = None
+        self._order = None
+
+    @classmethod
+    def from_frames(cls, *frames):
+        """Graph over the union of records in the given DataFrames."""
+        ids, statuses, deps = [], [], []
+        for df in frames:
+            ids += df["id"].tolist()
+            statuses += df["status"].tolist()
+            deps += df["depends_on"].tolist() if "depends_on" in df.columns else [None] * len(df)
+        return cls(ids, statuses, deps)
+
+    def __len__(self):
+        return len(self.ids)
+
+    @property
+    def num_edges(self) -> int:
+        return len(self.src)
+
+    def successors(self):
+        """Per-node successor lists (plain lists are far faster to walk)."""
+        if self._succ is None:
+            indptr, indices = self.indptr.tolist(), self.indices.tolist()
+            self._succ = [indices[indptr[v]:indptr[v + 1]] for v in range(len(self))]
+        return self._succ
+
+    # --- ordering ---
+    def topological_order(self) -> np.ndarray:
+        """Kahn's algorithm. Nodes on or downstream of a cycle are left out."""
+        if self._order is not None:
+            return self._order
+        succ = self.successors()
+        indegree = self.indegree.tolist()
+        queue = [v for v in range(len(self)) if indegree[v] == 0]
+        for v in queue:  # queue grows while iterating
+            for w in succ[v]:
+                indegree[w] -= 1
+                if indegree[w] == 0:
+                    queue.append(w)
+        self._order = np.array(queue, dtype=np.int64)
+        return self._order
+
+    def cycles(self) -> list:
+        """Node positions of every dependency cycle, one list per component."""
+        succ = self.successors()
+        n = len(self)
+        index = [-1] * n
+        low = [0] * n
+        on_stack = [False] * n
+        stack, found = [], []
+        counter = 0
+        for root in range(n):
+            if index[root] != -1:
+                continue
+            work = [(root, 0)]
+            while work:
+                v, i = work.pop()
+                if i == 0:
+                    index[v] = low[v] = counter
+                    counter += 1
+                    stack.append(v)
+                    on_stack[v] = True
+                recurse = False
+                edges = succ[v]
+                while i < len(edges):
+                    w = edges[i]
+                    i += 1
+                    if index[w] == -1:
+                        work.append((v, i))
+                        work.append((w, 0))
+                        recurse = True
+                        break
+                    if on_stack[w]:
+                        low[v] = min(low[v], index[w])
+                if recurse:
+                    continue
+                if low[v] == index[v]:
+                    component = []
+                    while True:
+                        w = stack.pop()
+                        on_stack[w] = False
+                        component.append(w)
+                        if w == v:
+                            break
+                    if len(component) > 1 or v in edges:
+                        found.append(sorted(component))
+                if work:
+                    parent = work[-1][0]
+                    low[parent] = min(low[parent], low[v])
+        return found
+
+    # --- paths ---
+    def critical_path(self, unfinished_only: bool = False) -> list:
+        """Longest chain of dependencies (node positions, upstream first).
+
+        With unfinished_only, done items contribute no length, so the chain
+        is the longest run of work still to do. Nodes in or behind cycles
+        are excluded.
+        """
+        order = self.topological_order()
+        if len(order) == 0:
+            return []
+        weight = (~self.done if unfinished_only else np.ones(len(self), bool)).astype(np.int64).tolist()
+        succ = self.successors()
+        length = [0] * len(self)
+        parent = [-1] * len(self)
+        for v in order.tolist():
+            length[v] += weight[v]
+            for w in succ[v]:
+                if length[v] > length[w]:
+                    length[w] = length[v]
+                    parent[w] = v
+        end = max(order.tolist(), key=length.__getitem__)
+        if length[end] == 0:
+            return []
+        path = []
+        while end != -1:
+            if weight[end]:
+                path.append(end)
+            end = parent[end]
+        return path[::-1]
+
+    # --- blocking ---
+    def blocked(self) -> np.ndarray:
+        """Unfinished items with at least one unfinished direct dependency."""
+        open_edges = ~self.done[self.src]
+        waiting = np.bincount(self.dst[open_edges], minlength=len(self))
+        return ~self.done & (waiting > 0)
+
+    def transitively_blocked(self) -> np.ndarray:
+        """Unfinished items with an unfinished dependency anywhere upstream.
+        Items in or behind a cycle can never start and count as blocked."""
+        order = self.topological_order()
+        flag = np.ones(len(self), dtype=bool)
+        flag[order] = False
+        flag_l = flag.tolist()
+        done = self.done.tolist()
+        succ = self.successors()
+        for v in order.tolist():
+            if flag_l[v] or not done[v]:
+                for w in succ[v]:
+                    flag_l[w] = True
+        return ~self.done & np.array(flag_l, dtype=bool)
+
+    def labels(self, positions) -> list:
+        return self.ids[np.asarray(positions, dtype=np.int64)].tolist()
+
+
+def summarize(graph: DependencyGraph) -> dict:
+    return {
+        "nodes": len(graph),
+        "edges": graph.num_edges,
+        "dangling_edges": graph.dangling_edges,
+        "duplicate_ids": graph.duplicate_ids,
+        "cycles": [graph.labels(c) for c in graph.cycles()],
+        "critical_path": graph.labels(graph.critical_path()),
+        "remaining_critical_path": graph.labels(graph.critical_path(unfinished_only=True)),
+        "blocked": graph.labels(np.flatnonzero(graph.blocked())),
+        "transitively_blocked": graph.labels(np.flatnonzero(graph.transitively_blocked())),
+    }
+
+
+def main():
+    import event_log
+
+    graph = DependencyGraph.from_frames(
+        pd.DataFrame(event_log.load_current("issue")),
+        pd.DataFrame(event_log.load_current("task")),
+    )
+    print(json.dumps(summarize(graph), indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,407 @@
+#!/usr/bin/env python3
+"""
+event_log.py — Append-only status transition log
+
+update_status.py records each transition as one JSON line appended to
+data/transitions.log.jsonl (flushed and fsync'd) instead of rewriting
+issues.jsonl and tasks.jsonl. Appending costs the same however large the
+canonical files are.
+
+Readers call load_current() to get canonical records with any pending
+events applied, or load_current_records() to fetch a few records by id
+through the byte-offset index (jsonl_index.py). Compaction folds the log
+back into the canonical JSONL:
+
+    python scripts/event_log.py --compact
+
+Applying an event is idempotent: update_status.py gives each record
+strictly increasing history timestamps, so an event at or before the
+record's last history entry has already been applied and is skipped.
+That makes any replay harmless, whether it is an interrupted compaction
+re-run, a reader that sees a rewritten canonical file next to the
+not-yet-cleared log, or a crash between the issues and tasks passes.
+
+Compaction clears the log through a marker. Once both canonical files
+are rewritten, it records the folded byte offset in
+data/.transitions.compacted, then truncates the log and removes the
+marker. While the marker is present, readers skip the folded prefix. The
+next lock holder finishes a truncation that a crash interrupted.
+
+Concurrent writers: update_status.py validates against an unlocked read
+and then submits its events with the version (status@timestamp) of each
+record it read. submit() spools the batch and takes an exclusive flock
+on data/.transitions.lock. Whoever holds the lock commits every spooled
+batch in one append and fsync (group commit). A batch whose records have
+moved on since they were read is rejected with ConflictError, and the
+writer re-reads and retries. Compaction takes the same lock.
+
+Each commit also folds the touched records into the per-record Merkle
+trees (merkle.py).
+"""
+
+import argparse
+import fcntl
+import json
+import os
+import time
+import uuid
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+import jsonl_index
+import merkle
+
+
+# === Paths ===
+DATA_DIR = Path("data")
+LOG_PATH = DATA_DIR / "transitions.log.jsonl"
+LOCK_PATH = DATA_DIR / ".transitions.lock"
+SPOOL_DIR = DATA_DIR / ".transitions.spool"
+COMPACTED_PATH = DATA_DIR / ".transitions.compacted"
+
+CANONICAL_FILES = {
+    "issue": DATA_DIR / "issues.jsonl",
+    "task": DATA_DIR / "tasks.jsonl",
+}
+
+
+# === JSONL helpers ===
+def load_jsonl(path: Path) -> list:
+    with open(path, "r") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def write_atomic(path: Path, text: str):
+    """Write text to a temp file, fsync it, then rename over path."""
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    with open(tmp_path, "w") as f:
+        f.write(text)
+        f.flush()
+        os.fsync(f.fileno())
+    tmp_path.replace(path)
+
+
+def save_jsonl_atomic(path: Path, records: list):
+    write_atomic(path, "".join(json.dumps(r, separators=(",", ":")) + "\n" for r in records))
+
+
+# === Locking ===
+@contextmanager
+def locked(path: Path = LOCK_PATH):
+    """Hold the exclusive writer lock (advisory flock) for the block."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "a") as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+# === Event log ===
+def make_event(entity: str, record_id: str, old_status: str, entry: dict) -> dict:
+    return {
+        "entity": entity,
+        "id": record_id,
+        "from": old_status,
+        "status": entry["status"],
+        "timestamp": entry["timestamp"],
+        "actor": entry["actor"],
+        "reason": entry["reason"],
+    }
+
+
+def append_events(events: list, path: Path = LOG_PATH):
+    """Durably append events: one write, then flush and fsync."""
+    if not events:
+        return
+    path.parent.mkdir(parents=True, exist_ok=True)
+    payload = "".join(json.dumps(e, separators=(",", ":")) + "\n" for e in events)
+    with open(path, "a") as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+
+
+def folded_offset(path: Path = LOG_PATH) -> int:
+    """Bytes at the head of the log that a compaction has already folded
+    into the canonical files but not yet truncated (0 if none)."""
+    if path != LOG_PATH:
+        return 0
+    try:
+        with open(COMPACTED_PATH, "r") as f:
+            offset = json.load(f)["offset"]
+        size = path.stat().st_size
+    except (FileNotFoundError, ValueError, KeyError):
+        return 0
+    # A log shorter than the marker has already been truncated
+    return offset if size >= offset else 0
+
+
+def scan_log(path: Path = LOG_PATH) -> tuple:
+    """(events, end offset of the last complete line). A torn final line
+    (crash mid-append) is ignored."""
+    if not path.exists():
+        return [], 0
+    events = []
+    with open(path, "rb") as f:
+        offset = folded_offset(path)
+        f.seek(offset)
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            offset += len(line)
+            if line.strip():
+                events.append(json.loads(line))
+    return events, offset
+
+
+def read_events(path: Path = LOG_PATH, entity: str = None, record_id: str = None) -> list:
+    """Read pending (not yet compacted) events in order."""
+    events, _ = scan_log(path)
+    return [e for e in events
+            if (entity is None or e["entity"] == entity) and (record_id is None or e["id"] == record_id)]
+
+
+def parse_timestamp(value: str) -> datetime:
+    ts = datetime.fromisoformat(value)
+    return ts if ts.tzinfo is not None else ts.replace(tzinfo=timezone.utc)
+
+
+def apply_event(record: dict, event: dict) -> bool:
+    """Apply one event to a record; returns False if it was already applied
+    (its timestamp is not after the record's last history entry)."""
+    history = record.setdefault("status_history", [])
+    last = history[-1].get("timestamp") if history else None
+    if last and parse_timestamp(event["timestamp"]) <= parse_timestamp(last):
+        return False
+    record["status"] = event["status"]
+    history.append({
+        "status": event["status"],
+        "timestamp": event["timestamp"],
+        "actor": event["actor"],
+        "reason": event["reason"],
+    })
+    return True
+
+
+def apply_events(records: list, events: list) -> list:
+    by_id = {r["id"]: r for r in records}
+    for event in events:
+        record = by_id.get(event["id"])
+        if record is None:
+            raise KeyError(f"Event for unknown {event['entity']} '{event['id']}'")
+        apply_event(record, event)
+    return records
+
+
+# === Materialized view ===
+def load_current(entity: str) -> list:
+    """Canonical records for `entity` ("issue" or "task") with pending
+    transitions from the event log applied."""
+    records = load_jsonl(CANONICAL_FILES[entity])
+    return apply_events(records, read_events(entity=entity))
+
+
+def load_current_records(entity: str, ids) -> dict:
+    """Fetch only the given records through the byte-offset index and
+    apply their pending transitions. Returns {id: record}."""
+    ids = set(ids)
+    records = jsonl_index.fetch_many(CANONICAL_FILES[entity], ids)
+    events = [e for e in read_events(entity=entity) if e["id"] in records]
+    apply_events(list(records.values()), events)
+    return records
+
+
+# === Group commit ===
+class ConflictError(Exception):
+    """A submitted batch was read from records that have since changed."""
+
+
+def record_key(entity: str, record_id: str) -> str:
+    return f"{entity}:{record_id}"
+
+
+def record_version(record: dict) -> str:
+    history = record.get("status_history") or [{}]
+    return f"{record.get('status')}@{history[-1].get('timestamp')}"
+
+
+def submit(events: list, expected: dict) -> dict:
+    """Commit events, provided every record in `expected` ({record_key:
+    record_version}) is still at the version the caller read.
+
+    Raises ConflictError otherwise; nothing from the batch is written.
+    """
+    SPOOL_DIR.mkdir(parents=True, exist_ok=True)
+    ticket = f"{time.time_ns():020d}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+    events = [dict(e, txn=ticket) for e in events]
+    batch_path = SPOOL_DIR / f"{ticket}.batch"
+    write_atomic(batch_path, json.dumps({"events": events, "expected": expected}))
+
+    result_path = SPOOL_DIR / f"{ticket}.result"
+    acquired = False
+    try:
+        with locked():
+            acquired = True
+            # Another writer may already have committed us as part of its group
+            if not result_path.exists():
+                commit_spool()
+            with open(result_path, "r") as f:
+                result = json.load(f)
+            result_path.unlink()
+    except BaseException:
+        # Interrupted while waiting for the lock: withdraw the batch so no
+        # later lock holder commits a transition the caller saw fail
+        if not acquired:
+            batch_path.unlink(missing_ok=True)
+        raise
+
+    if result["status"] == "conflict":
+        raise ConflictError(f"Records changed by another writer: {', '.join(result['records'])}")
+    return result
+
+
+def ticket_pid(path: Path) -> int:
+    """The writer pid embedded in a spool ticket (<time_ns>-<pid>-<nonce>)."""
+    return int(path.stem.split("-")[1])
+
+
+def remove_orphaned_results():
+    """Delete .result files whose writer process has exited, so nobody is
+    left to read them. Caller holds the lock."""
+    for result_path in SPOOL_DIR.glob("*.result"):
+        try:
+            os.kill(ticket_pid(result_path), 0)
+        except ProcessLookupError:
+            result_path.unlink(missing_ok=True)
+        except (PermissionError, ValueError, IndexError):
+            continue
+
+
+def commit_spool() -> int:
+    """Commit every spooled batch with one append. Caller holds the lock.
+
+    Returns the number of batches committed.
+    """
+    batch_paths = sorted(SPOOL_DIR.glob("*.batch"))
+    if not batch_paths:
+        return 0
+    finish_compaction()
+    batches = []
+    for batch_path in batch_paths:
+        try:
+            with open(batch_path, "r") as f:
+                batches.append((batch_path, json.load(f)))
+        except FileNotFoundError:
+            continue  # withdrawn by its writer after we listed it
+
+    logged = read_events()
+    done = {e.get("txn") for e in logged}
+    touched = {}
+    for _, batch in batches:
+        for key in batch["expected"]:
+            entity, record_id = key.split(":", 1)
+            touched.setdefault(entity, set()).add(record_id)
+    current = {}
+    for entity, ids in touched.items():
+        records = jsonl_index.fetch_many(CANONICAL_FILES[entity], ids)
+        pending = [e for e in logged if e["entity"] == entity and e["id"] in records]
+        apply_events(list(records.values()), pending)
+        current.update({record_key(entity, rid): r for rid, r in records.items()})
+
+    accepted, results = [], []
+    for batch_path, batch in batches:
+        ticket = batch_path.stem
+        events = batch["events"]
+        stale = [key for key, version in batch["expected"].items()
+                 if key not in current or record_version(current[key]) != version]
+        if ticket in done:
+            result = {"status": "committed", "events": len(events)}  # replay after a crash
+        elif stale:
+            result = {"status": "conflict", "records": stale}
+        else:
+            for e in events:
+                apply_event(current[record_key(e["entity"], e["id"])], e)
+            accepted += events
+            result = {"status": "committed", "events": len(events)}
+        results.append((batch_path, result))
+
+    append_events(accepted)
+    for entity in touched:
+        changed = {e["id"]: current[record_key(entity, e["id"])] for e in accepted if e["entity"] == entity}
+        if changed:
+            merkle.update(CANONICAL_FILES[entity], changed, lambda: load_current(entity))
+    for batch_path, result in results:
+        write_atomic(batch_path.with_suffix(".result"), json.dumps(result))
+        batch_path.unlink(missing_ok=True)
+    remove_orphaned_results()
+    return sum(1 for _, r in results if r["status"] == "committed")
+
+
+def current_root(entity: str) -> str:
+    """Merkle root over `entity`'s current records.
+
+    A stale tree is rebuilt under the writer lock, so the rebuild cannot
+    overwrite a newer tree that a concurrent commit just saved.
+    """
+    canonical = CANONICAL_FILES[entity]
+    current = merkle.stored_root(canonical)
+    if current is None:
+        with locked():
+            current = merkle.ensure(canonical, lambda: load_current(entity))
+    return current
+
+
+def finish_compaction(path: Path = LOG_PATH):
+    """Complete a compaction whose truncation was interrupted. Caller holds the lock."""
+    if not COMPACTED_PATH.exists():
+        return
+    if path.exists():
+        with open(path, "r+") as f:
+            f.truncate(0)
+            f.flush()
+            os.fsync(f.fileno())
+    COMPACTED_PATH.unlink()
+
+
+def compact(path: Path = LOG_PATH) -> int:
+    """Fold the event log into the canonical JSONL files and clear it.
+
+    Returns the number of events folded.
+    """
+    with locked():
+        finish_compaction(path)
+        events, offset = scan_log(path)
+        if not events:
+            return 0
+        for entity, canonical in CANONICAL_FILES.items():
+            mine = [e for e in events if e["entity"] == entity]
+            if mine:
+                # Record state is unchanged by folding, so a fresh tree stays valid
+                fresh = merkle.stored_root(canonical) is not None
+                save_jsonl_atomic(canonical, apply_events(load_jsonl(canonical), mine))
+                merkle.restamp(canonical, fresh)
+        # From here on readers skip the folded prefix, whether or not the
+        # truncation below completes
+        write_atomic(COMPACTED_PATH, json.dumps({"offset": offset}))
+        finish_compaction(path)
+        return len(events)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--compact", action="store_true",
+                        help="Fold pending transitions into issues.jsonl and tasks.jsonl.")
+    args = parser.parse_args()
+
+    if args.compact:
+        folded = compact()
+        print(f"Compacted {folded} transition(s) into canonical JSONL.")
+    else:
+        print(f"{len(read_events())} pending transition(s) in {LOG_PATH}")
+
+
+if __name__ == "__main__":
+    main()
@@ -21,12 +21,18 @@ T02 includes:
 Future tasks (T03–T04) will extend this with Parquet output and MLflow logging.
 """
 
+import argparse
 import json
 from pathlib import Path
 from datetime import datetime
 
+import numpy as np
 import pandas as pd
 
+import catalog
+import event_log
+from dependency_graph import DependencyGraph
+
 
 # === Paths ===
 DATA_DIR = Path("data")
@@ -48,14 +54,112 @@ def load_jsonl(path: Path) -> pd.DataFrame:
 
 
 def load_canonical():
-    """Load all canonical governance datasets."""
+    """Load all canonical governance datasets, including status transitions
+    still pending in the event log."""
     sprints = load_jsonl(DATA_DIR / "sprints.jsonl")
-    issues = load_jsonl(DATA_DIR / "issues.jsonl")
-    tasks = load_jsonl(DATA_DIR / "tasks.jsonl")
+    issues = pd.DataFrame(event_log.load_current("issue"))
+    tasks = pd.DataFrame(event_log.load_current("task"))
     return sprints, issues, tasks
 
 
+# === Parquet Loader ===
+# Columns compute_metrics reads; status_history and free text are never loaded
+METRIC_COLUMNS = {
+    "sprints": ["id", "issues"],
+    "issues": ["id", "status", "depends_on"],
+    "tasks": ["id", "issue_id", "status", "depends_on"],
+}
+
+
+def parquet_is_fresh() -> bool:
+    """True when every dataset's Parquet (jsonl_to_parquet.py) was written
+    after its canonical JSONL was last modified."""
+    import jsonl_to_parquet
+
+    for name in METRIC_COLUMNS:
+        manifest = jsonl_to_parquet.manifest_path(name)
+        source = DATA_DIR / f"{name}.jsonl"
+        if not manifest.exists() or manifest.stat().st_mtime_ns < source.stat().st_mtime_ns:
+            return False
+    return True
+
+
+def apply_pending_status(df: pd.DataFrame, entity: str) -> pd.DataFrame:
+    """Overlay the latest status from transitions not yet compacted."""
+    latest = {e["id"]: e["status"] for e in event_log.read_events(entity=entity)}
+    if latest:
+        pending = df["id"].map(latest)
+        df["status"] = pending.where(pending.notna(), df["status"])
+    return df
+
+
+def load_parquet():
+    """Load the metric columns from validated Parquet, with pending status
+    transitions applied."""
+    import jsonl_to_parquet
+
+    sprints, issues, tasks = (
+        jsonl_to_parquet.read_dataset(name, columns, skip_missing=True)
+        for name, columns in METRIC_COLUMNS.items()
+    )
+    # Parquet lists arrive as arrays; the dependency metrics count Python lists
+    for df in (issues, tasks):
+        if "depends_on" in df.columns:
+            df["depends_on"] = [list(v) if v is not None else v for v in df["depends_on"]]
+    return sprints, apply_pending_status(issues, "issue"), apply_pending_status(tasks, "task")
+
+
+def load_inputs(source: str = "auto"):
+    """Return (sprints, issues, tasks, source used). "auto" reads Parquet
+    when it is fresh and falls back to the canonical JSONL otherwise."""
+    if source == "parquet" or (source == "auto" and parquet_is_fresh()):
+        try:
+            return (*load_parquet(), "parquet")
+        except (ValueError, FileNotFoundError):
+            if source == "parquet":
+                raise
+    return (*load_canonical(), "jsonl")
+
+
 # === Metrics Computation (T02) ===
+def task_counts(tasks: pd.DataFrame) -> tuple:
+    """Task counts by issue (rows, sorted) and status (columns, sorted), in
+    one pass over tasks. The last row and column count tasks with a missing
+    issue_id or status, so every task is counted exactly once.
+
+    Returns (counts, issue_ids, statuses).
+    """
+    issue_codes, issue_ids = pd.factorize(tasks["issue_id"], sort=True)
+    status_codes, statuses = pd.factorize(tasks["status"], sort=True)
+    n_rows, n_cols = len(issue_ids) + 1, len(statuses) + 1
+    issue_codes = np.where(issue_codes < 0, n_rows - 1, issue_codes)
+    status_codes = np.where(status_codes < 0, n_cols - 1, status_codes)
+    counts = np.bincount(issue_codes * n_cols + status_codes, minlength=n_rows * n_cols)
+    return counts.reshape(n_rows, n_cols), issue_ids, statuses
+
+
+def issue_status_crosstab(counts: np.ndarray, issue_ids: pd.Index, statuses: pd.Index) -> pd.DataFrame:
+    """The issue × status crosstab from task_counts(). Matches
+    groupby(["issue_id", "status"]).size().unstack(fill_value=0): rows or
+    columns that only occur alongside a missing key are dropped."""
+    known = counts[:-1, :-1]
+    rows = known.any(axis=1)
+    cols = known.any(axis=0)
+    return pd.DataFrame(known[rows][:, cols], index=issue_ids[rows], columns=statuses[cols])
+
+
+def contains(keys: pd.Series, values: pd.Series) -> np.ndarray:
+    """values.isin(keys) via a hash-index lookup; Series.isin on Arrow-backed
+    strings round-trips the keys through Python objects."""
+    return pd.Index(keys.dropna().unique()).get_indexer(values) >= 0
+
+
+def status_column(crosstab: pd.DataFrame, status: str) -> np.ndarray:
+    if status not in crosstab.columns:
+        return np.zeros(len(crosstab), dtype=np.int64)
+    return crosstab[status].to_numpy()
+
+
 def compute_metrics(sprints: pd.DataFrame, issues: pd.DataFrame, tasks: pd.DataFrame) -> dict:
     metrics = {
         "timestamp": datetime.now().isoformat(),
@@ -64,23 +168,26 @@ def compute_metrics(sprints: pd.DataFrame, issues: pd.DataFrame, tasks: pd.DataF
         "num_tasks": len(tasks),
     }
 
+    # One issue × status count of tasks feeds every per-issue, per-status
+    # and flow metric; its margins include tasks missing the other key
+    counts, issue_ids, statuses = task_counts(tasks)
+    crosstab = issue_status_crosstab(counts, issue_ids, statuses)
+    task_status_counts = pd.Series(counts[:, :-1].sum(axis=0), index=statuses)
+    task_status_counts = task_status_counts.sort_values(ascending=False, kind="stable")
+    issue_status_counts = issues["status"].value_counts()
+
     # Tasks per issue
-    metrics["tasks_per_issue"] = (
-        tasks.groupby("issue_id").size().rename("tasks_per_issue").to_dict()
-    )
+    metrics["tasks_per_issue"] = dict(zip(issue_ids.tolist(), counts[:-1].sum(axis=1).tolist()))
 
     # Issues per sprint
     issues_per_sprint = {}
     if "issues" in sprints.columns:
-        for _, row in sprints.iterrows():
-            sprint_id = row["id"]
-            issue_list = row.get("issues", [])
-            issues_per_sprint[sprint_id] = len(issue_list)
+        issues_per_sprint = dict(zip(sprints["id"], map(len, sprints["issues"])))
     metrics["issues_per_sprint"] = issues_per_sprint
 
     # Status distributions
-    metrics["issue_status_distribution"] = issues["status"].value_counts().to_dict()
-    metrics["task_status_distribution"] = tasks["status"].value_counts().to_dict()
+    metrics["issue_status_distribution"] = issue_status_counts.to_dict()
+    metrics["task_status_distribution"] = task_status_counts.to_dict()
 
     # Dependency metrics
     issues_with_deps = issues["depends_on"].apply(
@@ -91,56 +198,64 @@ def compute_metrics(sprints: pd.DataFrame, issues: pd.DataFrame, tasks: pd.DataF
     metrics["avg_dependencies_per_issue"] = float(issues_with_deps.mean())
 
     # Sprint completion ratio
-    completed_issues = (issues["status"] == "done").sum()
+    completed_issues = issue_status_counts.get("done", 0)
     total_issues = len(issues)
     metrics["sprint_completion_ratio"] = (
         completed_issues / total_issues if total_issues > 0 else 0
     )
 
     # Mini-Kanban snapshot: tasks per issue per status
-    tasks_per_issue_status = (
-        tasks.groupby(["issue_id", "status"])
-             .size()
-             .unstack(fill_value=0)
-             .to_dict(orient="index")
-    )
-    metrics["tasks_per_issue_status"] = tasks_per_issue_status
+    metrics["tasks_per_issue_status"] = crosstab.to_dict(orient="index")
 
     # Sprint workload summary
     metrics["sprint_workload_summary"] = {
         "total_tasks": len(tasks),
-        "tasks_todo": int((tasks["status"] == "todo").sum()),
-        "tasks_in_progress": int((tasks["status"] == "in_progress").sum()),
-        "tasks_in_review": int((tasks["status"] == "review").sum()),
-        "tasks_done": int((tasks["status"] == "done").sum()),
+        "tasks_todo": int(task_status_counts.get("todo", 0)),
+        "tasks_in_progress": int(task_status_counts.get("in_progress", 0)),
+        "tasks_in_review": int(task_status_counts.get("review", 0)),
+        "tasks_done": int(task_status_counts.get("done", 0)),
     }
 
     # Issue load score (weighted)
-    weights = {"todo": 1, "in_progress": 2, "review": 3, "done": 0}
-    issue_load_scores = {}
-    for issue_id, row in tasks_per_issue_status.items():
-        score = sum(row.get(status, 0) * weight for status, weight in weights.items())
-        issue_load_scores[issue_id] = score
-    metrics["issue_load_score"] = issue_load_scores
+    weights = pd.Series({"todo": 1, "in_progress": 2, "review": 3, "done": 0})
+    load = crosstab.reindex(columns=weights.index, fill_value=0).to_numpy() @ weights.to_numpy()
+    metrics["issue_load_score"] = dict(zip(crosstab.index, load.tolist()))
 
     # Flow health indicator
-    review_overload = sum(
-        1 for row in tasks_per_issue_status.values() if row.get("review", 0) >= 2
-    )
-    in_progress_overload = sum(
-        1 for row in tasks_per_issue_status.values() if row.get("in_progress", 0) >= 3
-    )
-    blocked_issues = int((issues_with_deps > 0).sum())
+    review_overload = int((status_column(crosstab, "review") >= 2).sum())
+    in_progress_overload = int((status_column(crosstab, "in_progress") >= 3).sum())
+    # Blocked = not done and waiting on at least one unfinished dependency
+    graph = DependencyGraph.from_frames(issues, tasks)
+    is_issue = graph.positions < len(issues)
+    blocked = graph.blocked()
+    blocked_issues = int((blocked & is_issue).sum())
 
     metrics["flow_health"] = {
         "review_overload": review_overload,
         "in_progress_overload": in_progress_overload,
         "blocked_issues": blocked_issues,
+        "blocked_tasks": int((blocked & ~is_issue).sum()),
+        "transitively_blocked_items": int(graph.transitively_blocked().sum()),
     }
 
+    # Dependency graph over issue and task depends_on edges
+    cycles = graph.cycles()
+    remaining = graph.critical_path(unfinished_only=True)
+    metrics["dependency_graph"] = {
+        "nodes": len(graph),
+        "edges": graph.num_edges,
+        "dangling_edges": graph.dangling_edges,
+        "duplicate_ids": graph.duplicate_ids,
+        "num_cycles": len(cycles),
+        "critical_path_length": len(graph.critical_path()),
+        "remaining_critical_path_length": len(remaining),
+    }
+    metrics["dependency_cycles"] = [graph.labels(c) for c in cycles]
+    metrics["remaining_critical_path"] = graph.labels(remaining)
+
     # Validation metrics
-    orphan_tasks = tasks[~tasks["issue_id"].isin(issues["id"])]
-    issues_without_tasks = issues[~issues["id"].isin(tasks["issue_id"])]
+    orphan_tasks = tasks[~contains(issues["id"], tasks["issue_id"])]
+    issues_without_tasks = issues[~contains(tasks["issue_id"], issues["id"])]
 
     metrics["validation"] = {
         "orphan_tasks": orphan_tasks["id"].tolist(),
@@ -168,13 +283,20 @@ def log_to_mlflow(metrics: dict):
 
 # === Main Orchestration ===
 def main():
-    sprints, issues, tasks = load_canonical()
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--source", choices=["auto", "jsonl", "parquet"], default="auto",
+                        help="Input data: validated Parquet if fresh (auto), or force one.")
+    args = parser.parse_args()
+
+    sprints, issues, tasks, source = load_inputs(args.source)
+    print(f"Loaded {len(tasks)} tasks from {source}")
     metrics = compute_metrics(sprints, issues, tasks)
 
     timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
     output_path = OUTPUT_DIR / f"metrics-{timestamp}.json"
 
     write_json(metrics, output_path)
+    catalog.register(output_path, "metrics", CURRENT_SPRINT)
     log_to_mlflow(metrics)
 
     print(f"Metrics written to {output_path}")
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+flow_metrics.py — Flow analytics from status_history
+
+Explodes every issue and task status_history once into a transitions
+table (one row per status entry with entered_at / exited_at), then derives
+with vectorized date arithmetic:
+
+- Per-item lead time (created_at → first done) and cycle time
+  (first in_progress → first done), in hours
+- Time spent in each status, per item
+- Daily WIP per status (items in that status at the end of each UTC day)
+- Cumulative-flow-diagram series (items that have entered each status by
+  the end of each day)
+
+Outputs, under reports/<sprint>/flow/:
+- flow_items.parquet    per-item times
+- flow_daily.parquet    date, entity, status, wip, cumulative_arrivals
+- flow-<timestamp>.json summary percentiles and current WIP
+"""
+
+import argparse
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+import catalog
+import event_log
+from jsonl_to_parquet import explode_histories
+
+
+# === Paths ===
+SPRINT_FILE = Path(".sprint")
+CURRENT_SPRINT = SPRINT_FILE.read_text().strip() if SPRINT_FILE.exists() else "sprint-04"
+
+OUTPUT_DIR = Path("reports") / CURRENT_SPRINT / "flow"
+
+# === Workflow anchors ===
+START_STATUS = "in_progress"
+DONE_STATUS = "done"
+HOUR = pd.Timedelta(hours=1)
+DAY_NS = 86_400 * 10**9
+
+
+# === Loading ===
+def load_items() -> pd.DataFrame:
+    """Current issues and tasks (pending transitions applied), one row each."""
+    frames = []
+    for entity in ("issue", "task"):
+        df = pd.DataFrame(event_log.load_current(entity), columns=["id", "status", "created_at", "status_history"])
+        df.insert(0, "entity", entity)
+        frames.append(df)
+    return pd.concat(frames, ignore_index=True)
+
+
+def to_utc(values) -> pd.Series:
+    return pd.to_datetime(pd.Series(values, dtype=object), utc=True, format="ISO8601", errors="coerce")
+
+
+# === Transitions table ===
+def explode_transitions(items: pd.DataFrame, as_of: pd.Timestamp) -> pd.DataFrame:
+    """One row per status entry: item (row in items), status, entered_at,
+    exited_at (the next entry, or as_of for the current status)."""
+    flat = explode_histories(items["status_history"].to_numpy())
+    entered = pd.Series(flat["epoch_ns"]).astype("datetime64[ns]").dt.tz_localize("UTC")
+    t = pd.DataFrame({
+        "item": flat["record"],
+        "status": flat["status"],
+        "entered_at": entered.where(flat["valid_ts"]),
+    })
+    t = t[t["entered_at"].notna() & t["status"].notna()].reset_index(drop=True)
+
+    # Nothing after the cut-off counts: a status left after as_of is current
+    t = t[t["entered_at"] <= as_of].reset_index(drop=True)
+
+    # Histories are in order within each item, so the next row of the same
+    # item is when this status was left
+    item = t["item"].to_numpy()
+    same_next = np.append(item[1:] == item[:-1], False)
+    exited = t["entered_at"].shift(-1)
+    t["exited_at"] = exited.where(same_next, as_of)
+    t["is_current"] = ~same_next
+    t["duration"] = t["exited_at"] - t["entered_at"]
+    return t
+
+
+# === Per-item times ===
+def first_entry(t: pd.DataFrame, status: str, n: int) -> pd.Series:
+    hits = t[t["status"] == status]
+    return hits.groupby("item")["entered_at"].min().reindex(range(n))
+
+
+def item_times(items: pd.DataFrame, t: pd.DataFrame) -> pd.DataFrame:
+    n = len(items)
+    created = to_utc(items["created_at"])
+    created = created.fillna(t.groupby("item")["entered_at"].min().reindex(range(n)))
+    started = first_entry(t, START_STATUS, n)
+    done = first_entry(t, DONE_STATUS, n)
+
+    out = items[["entity", "id", "status"]].copy()
+    out["created_at"] = created
+    out["started_at"] = started
+    out["done_at"] = done
+    out["lead_time_h"] = (done - created) / HOUR
+    out["cycle_time_h"] = (done - started).where(done >= started) / HOUR
+
+    in_status = t.groupby(["item", "status"])["duration"].sum().unstack(fill_value=pd.Timedelta(0))
+    in_status = (in_status.reindex(range(n), fill_value=pd.Timedelta(0)) / HOUR).add_prefix("time_in_")
+    in_status.columns = [f"{c}_h" for c in in_status.columns]
+    return pd.concat([out, in_status], axis=1)
+
+
+# === Daily series ===
+def day_number(values: pd.Series) -> np.ndarray:
+    """Whole UTC days since the epoch."""
+    return values.astype("int64").to_numpy() // DAY_NS
+
+
+def daily_series(items: pd.DataFrame, t: pd.DataFrame, as_of: pd.Timestamp) -> pd.DataFrame:
+    """Long table of date, entity, status, wip, cumulative_arrivals."""
+    if t.empty:
+        return pd.DataFrame(columns=["date", "entity", "status", "wip", "cumulative_arrivals"])
+    entity = items["entity"].to_numpy()[t["item"].to_numpy()]
+    status = t["status"].to_numpy()
+    entered = day_number(t["entered_at"])
+    days = np.arange(entered.min(), as_of.value // DAY_NS + 1)
+
+    # WIP: +1 on the day a status is entered, -1 on the day it is left
+    closed = ~t["is_current"].to_numpy()
+    deltas = pd.DataFrame({
+        "day": np.concatenate([entered, day_number(t["exited_at"])[closed]]),
+        "entity": np.concatenate([entity, entity[closed]]),
+        "status": np.concatenate([status, status[closed]]),
+        "delta": np.concatenate([np.ones(len(t), dtype=np.int64), -np.ones(closed.sum(), dtype=np.int64)]),
+    })
+    wip = deltas.groupby(["entity", "status", "day"])["delta"].sum()
+
+    # CFD: first day each item entered each status
+    firsts = pd.DataFrame({"entity": entity, "item": t["item"].to_numpy(), "status": status, "day": entered})
+    firsts = firsts.groupby(["entity", "item", "status"], sort=False)["day"].min().reset_index()
+    arrivals = firsts.groupby(["entity", "status", "day"]).size()
+
+    series = pd.concat({"wip": wip, "cumulative_arrivals": arrivals}, axis=1).fillna(0)
+    series = series.unstack(["entity", "status"], fill_value=0).reindex(days, fill_value=0).cumsum()
+    series = series.stack(["entity", "status"], future_stack=True).reset_index()
+    series.insert(0, "date", pd.to_datetime(series.pop("day") * DAY_NS, utc=True))
+    return series.astype({"wip": "int64", "cumulative_arrivals": "int64"})
+
+
+# === Summary ===
+def percentiles(values: pd.Series) -> dict:
+    values = values.dropna()
+    if values.empty:
+        return {"count": 0, "p50": None, "p85": None, "mean": None}
+    return {
+        "count": int(len(values)),
+        "p50": float(values.quantile(0.5)),
+        "p85": float(values.quantile(0.85)),
+        "mean": float(values.mean()),
+    }
+
+
+def summarize(times: pd.DataFrame, daily: pd.DataFrame, num_transitions: int, as_of) -> dict:
+    summary = {"timestamp": datetime.now().isoformat(), "as_of": as_of.isoformat(),
+               "num_items": len(times), "num_transitions": num_transitions}
+    last_day = daily[daily["date"] == daily["date"].max()] if not daily.empty else daily
+    for entity, group in times.groupby("entity"):
+        wip = last_day[last_day["entity"] == entity]
+        summary[entity] = {
+            "lead_time_hours": percentiles(group["lead_time_h"]),
+            "cycle_time_hours": percentiles(group["cycle_time_h"]),
+            "current_wip": {s: int(c) for s, c in zip(wip["status"], wip["wip"]) if c},
+        }
+    return summary
+
+
+def compute_flow(items: pd.DataFrame, as_of: pd.Timestamp):
+    t = explode_transitions(items, as_of)
+    times = item_times(items, t)
+    daily = daily_series(items, t, as_of)
+    return times, daily, summarize(times, daily, len(t), as_of)
+
+
+# === Main Orchestration ===
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--as-of", help="ISO-8601 cut-off for open intervals (default: now).")
+    args = parser.parse_args()
+
+    as_of = pd.Timestamp(args.as_of) if args.as_of else pd.Timestamp(datetime.now(timezone.utc))
+    as_of = as_of.tz_localize("UTC") if as_of.tzinfo is None else as_of.tz_convert("UTC")
+
+    times, daily, summary = compute_flow(load_items(), as_of)
+
+    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    times.to_parquet(OUTPUT_DIR / "flow_items.parquet", index=False)
+    daily.to_parquet(OUTPUT_DIR / "flow_daily.parquet", index=False)
+
+    timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    summary_path = OUTPUT_DIR / f"flow-{timestamp}.json"
+    with open(summary_path, "w") as f:
+        json.dump(summary, f, indent=2)
+    catalog.register(summary_path, "flow", CURRENT_SPRINT)
+
+    print(f"Flow metrics written to {OUTPUT_DIR} ({len(times)} items)")
+
+
+if __name__ == "__main__":
+    main()
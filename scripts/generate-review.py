@@ -16,31 +16,100 @@ import sys
 from datetime import datetime
 from pathlib import Path
 
+import catalog
+
+
+TAIL_BLOCK_SIZE = 64 * 1024
+
 
 def load_json(path):
     with open(path, "r", encoding="utf-8") as f:
         return json.load(f)
 
 
-def load_latest_metrics(metrics_dir):
-    """Return the most recent metrics JSON file in the sprint metrics directory."""
-    files = sorted(metrics_dir.glob("metrics-*.json"))
-    if not files:
-        raise FileNotFoundError(f"No metrics files found in {metrics_dir}")
-    return load_json(files[-1]), files[-1]
-
-
-def load_latest_timeseries(ts_path):
-    """Load the full metrics time-series JSONL file."""
+def load_latest_metrics(sprint):
+    """Return the sprint's most recent metrics JSON file, found through the artifact catalog."""
+    path = catalog.latest("metrics", sprint)
+    if path is None:
+        raise FileNotFoundError(f"No metrics files found for {sprint}")
+    return load_json(path), path
+
+
+def load_sprint_ranges(ts_path):
+    """{sprint_id: [start, end]} byte range of each sprint's time-series
+    entries, from the ingestion manifest written by build_timeseries.py, or
+    None if the manifest is missing or does not match the JSONL."""
+    manifest_path = ts_path.with_name(f".{ts_path.stem}.manifest.json")
+    try:
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+    if manifest.get("jsonl_size") != ts_path.stat().st_size:
+        return None
+    return manifest.get("sprints")
+
+
+def iter_timeseries_reversed(ts_path, block_size=TAIL_BLOCK_SIZE, end=None):
+    """Yield time-series entries newest first, reading the JSONL backwards
+    one block at a time from end (a line boundary; the end of the file by
+    default), so only the tail of the file is ever decoded."""
+    with open(ts_path, "rb") as f:
+        pos = f.seek(0, os.SEEK_END) if end is None else end
+        rest = b""
+        while pos > 0:
+            step = min(block_size, pos)
+            pos -= step
+            f.seek(pos)
+            lines = (f.read(step) + rest).split(b"\n")
+            rest = lines.pop(0)  # possibly the tail end of an earlier line
+            for line in reversed(lines):
+                if line.strip():
+                    yield json.loads(line)
+        if rest.strip():
+            yield json.loads(rest)
+
+
+def load_latest_timeseries(ts_path, sprint):
+    """Return (previous_entry, current_entry) from the end of the time-series.
+
+    The current entry is the latest one for the sprint (the latest overall if
+    the sprint has none). The previous entry is the latest one of the sprint
+    before it, or, in a history without earlier sprints, the extraction just
+    before the current one.
+
+    With the ingestion manifest, the scan starts at the end of the sprint's
+    byte range, and a sprint with no entries reads only the latest entry.
+    """
     if not ts_path.exists():
         raise FileNotFoundError(f"Time-series file not found: {ts_path}")
 
-    entries = []
-    with open(ts_path, "r", encoding="utf-8") as f:
-        for line in f:
-            if line.strip():
-                entries.append(json.loads(line))
-    return entries
+    ranges = load_sprint_ranges(ts_path)
+    end = None
+    if ranges is not None:
+        if sprint not in ranges:
+            latest = next(iter_timeseries_reversed(ts_path), None)
+            if latest is None:
+                raise ValueError(f"Time-series file is empty: {ts_path}")
+            return {}, latest
+        end = ranges[sprint][1]
+
+    latest = current = earlier_extraction = None
+    for entry in iter_timeseries_reversed(ts_path, end=end):
+        if latest is None:
+            latest = entry
+        if current is None:
+            if entry.get("sprint_id") == sprint:
+                current = entry
+            continue
+        if entry.get("sprint_id") != current.get("sprint_id"):
+            return entry, current
+        if earlier_extraction is None:
+            earlier_extraction = entry
+
+    if latest is None:
+        raise ValueError(f"Time-series file is empty: {ts_path}")
+    return earlier_extraction or {}, current or latest
 
 
 def generate_markdown_review(sprint, timestamp, metrics, previous_entry, current_entry):
@@ -152,22 +221,14 @@ def main():
 
     # Paths
     sprint_dir = Path(f"reports/{sprint}")
-    metrics_dir = sprint_dir / "metrics"
     review_dir = sprint_dir / "review"
     review_dir.mkdir(parents=True, exist_ok=True)
 
     ts_path = Path("data/metrics_timeseries.jsonl")
 
     # Load data
-    metrics, metrics_file = load_latest_metrics(metrics_dir)
-    timeseries = load_latest_timeseries(ts_path)
-
-    if len(timeseries) < 2:
-        previous_entry = {}
-    else:
-        previous_entry = timeseries[-2]
-
-    current_entry = timeseries[-1]
+    metrics, metrics_file = load_latest_metrics(sprint)
+    previous_entry, current_entry = load_latest_timeseries(ts_path, sprint)
 
     # Timestamp
     now = datetime.now()
@@ -200,6 +261,9 @@ def main():
     with open(md_path, "w", encoding="utf-8") as f:
         f.write(md_content)
 
+    catalog.register(json_path, "review", sprint)
+    catalog.register(md_path, "review_md", sprint)
+
     print(f"Review generated:\n- {json_path}\n- {md_path}")
 
 
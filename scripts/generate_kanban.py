@@ -1,9 +1,15 @@
 #!/usr/bin/env python3
+import argparse
+import hashlib
 import json
+import re
 from datetime import datetime
 from pathlib import Path
 import sys
 
+import catalog
+import event_log
+
 DATA_DIR = Path("data")
 
 SPRINT_ID = Path(".sprint").read_text().strip() if Path(".sprint").exists() else "sprint-04"
@@ -14,6 +20,15 @@ MINUTES_DIR = REPORTS_DIR / "minutes"
 
 STATUS_ORDER = ["todo", "in_progress", "review", "done"]
 
+# Bump whenever render_board's output changes, so existing boards are rebuilt
+RENDERER_VERSION = 3
+
+# Items per status column on the board itself, and per overflow page
+COLUMN_LIMIT = 25
+PAGE_SIZE = 500
+PAGES_DIR = KANBAN_DIR / "pages"
+MANIFEST_PATH = KANBAN_DIR / ".build_manifest.json"
+
 def load_jsonl(path):
     with open(path, "r") as f:
         return [json.loads(line) for line in f]
@@ -25,46 +40,140 @@ def group_by_status(records):
         groups.setdefault(status, []).append(r)
     return groups
 
-def load_today_minutes():
+def minutes_path():
+    """Today's finalized standup minutes for the sprint, from the catalog (or None)."""
     today = datetime.now().strftime("%Y-%m-%d")
-    path = MINUTES_DIR / f"{today}.json"
-    if not path.exists():
+    return catalog.latest("minutes", SPRINT_ID, day=today)
+
+def load_today_minutes():
+    path = minutes_path()
+    if path is None:
         return None
     with open(path, "r") as f:
         return json.load(f)
 
-def render_markdown(title, issues, tasks, minutes):
-    lines = []
-    lines.append(f"# {title}")
-    lines.append("")
-    lines.append(f"Sprint: {SPRINT_ID}")
-    lines.append(f"Generated: {datetime.now().isoformat()}")
-    lines.append("")
+def sha256_file(path):
+    if path is None or not path.exists():
+        return None
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+def build_inputs():
+    """Everything the board depends on. The Merkle roots stand in for the
+    issue and task records, so an unchanged board never loads the JSONL."""
+    return {
+        "renderer_version": RENDERER_VERSION,
+        "sprint": SPRINT_ID,
+        "date": datetime.now().strftime("%Y-%m-%d"),
+        "issues_root": event_log.current_root("issue"),
+        "tasks_root": event_log.current_root("task"),
+        "minutes_sha256": sha256_file(minutes_path()),
+    }
+
+def load_manifest():
+    if not MANIFEST_PATH.exists():
+        return None
+    try:
+        with open(MANIFEST_PATH, "r") as f:
+            return json.load(f)
+    except ValueError:
+        return None
 
-    def section(header, items):
-        lines.append(f"## {header}")
-        lines.append("")
-        if not items:
-            lines.append("_None_")
-            lines.append("")
-            return
-        for item in sorted(items, key=lambda x: x["id"]):
-            summary = item.get("summary", "").strip()
-            lines.append(f"- **{item['id']}** — {summary}")
-        lines.append("")
+def is_up_to_date(manifest, inputs):
+    """Same inputs, and every output still holds what was last written."""
+    if manifest is None or manifest.get("inputs") != inputs:
+        return False
+    return all(sha256_file(Path(p)) == h for p, h in manifest.get("outputs", {}).items())
+
+def label(item):
+    return (item.get("summary") or item.get("title") or "").strip()
+
+def page_name(status, kind, n):
+    slug = re.sub(r"[^\w-]", "_", status)
+    return f"{slug}-{kind}-{n:03d}.md"
+
+def ordered_statuses(*groups):
+    present = set().union(*groups)
+    return [s for s in STATUS_ORDER if s in present] + sorted(present - set(STATUS_ORDER))
 
+def swimlanes(tasks, issue_by_id):
+    """Render id-sorted tasks as lanes under their parent issue, in one pass."""
+    lines = []
+    lane = object()
+    for t in tasks:
+        issue_id = t.get("issue_id")
+        if issue_id != lane:
+            lane = issue_id
+            issue = issue_by_id.get(issue_id)
+            if lines:
+                lines.append("")
+            if issue is None:
+                lines += [f"#### {issue_id or 'No issue'}", ""]
+            else:
+                lines += [f"#### {issue_id} — {label(issue)} `{issue.get('status', 'unknown')}`", ""]
+        lines.append(f"- **{t['id']}** — {label(t)}")
+    return lines
+
+def bullets(issues):
+    return [f"- **{i['id']}** — {label(i)}" for i in issues]
+
+def render_pages(status, kind, items, render_items, pages_dir, board_name):
+    """Split one column into PAGE_SIZE pages linked as a chain."""
+    pages = {}
+    count = (len(items) + PAGE_SIZE - 1) // PAGE_SIZE
+    for n in range(1, count + 1):
+        nav = [f"[Board](../{board_name})"]
+        if n > 1:
+            nav.append(f"[← Page {n - 1}]({page_name(status, kind, n - 1)})")
+        if n < count:
+            nav.append(f"[Page {n + 1} →]({page_name(status, kind, n + 1)})")
+        chunk = items[(n - 1) * PAGE_SIZE:n * PAGE_SIZE]
+        lines = [f"# {kind.capitalize()} — {status} (page {n} of {count})", "", " · ".join(nav), ""]
+        lines += render_items(chunk)
+        lines.append("")
+        pages[f"{pages_dir}/{page_name(status, kind, n)}"] = "\n".join(lines)
+    return pages
+
+def render_board(title, issues, tasks, minutes, pages_dir="pages", board_name="current.md"):
+    """Render the index page and the per-status pages.
+
+    Returns (index markdown, {page path relative to the index: markdown}).
+    The index shows at most COLUMN_LIMIT issues and tasks per status and
+    links to the first page of the rest, so its size does not grow with
+    the backlog. Pages go in pages_dir, next to an index named board_name.
+    """
+    issues = sorted(issues, key=lambda x: x["id"])
+    tasks = sorted(tasks, key=lambda x: x["id"])
+    issue_by_id = {i["id"]: i for i in issues}
     issue_groups = group_by_status(issues)
     task_groups = group_by_status(tasks)
+    statuses = ordered_statuses(issue_groups, task_groups)
 
-    all_statuses = [s for s in STATUS_ORDER if s in issue_groups or s in task_groups]
-    unexpected = sorted(
-        set(issue_groups.keys()) | set(task_groups.keys()) - set(STATUS_ORDER)
-    )
-    all_statuses.extend(unexpected)
+    lines = [f"# {title}", "", f"Sprint: {SPRINT_ID}", f"Generated: {datetime.now().isoformat()}", ""]
+    lines += ["| Status | Issues | Tasks |", "|---|---|---|"]
+    for status in statuses:
+        lines.append(f"| {status} | {len(issue_groups.get(status, []))} | {len(task_groups.get(status, []))} |")
+    lines.append("")
 
-    for status in all_statuses:
-        section(f"Issues — {status}", issue_groups.get(status, []))
-        section(f"Tasks — {status}", task_groups.get(status, []))
+    pages = {}
+    for status in statuses:
+        column_issues = issue_groups.get(status, [])
+        column_tasks = task_groups.get(status, [])
+        lines += [f"## {status}", ""]
+        for kind, items, render_items in (("issues", column_issues, bullets),
+                                          ("tasks", column_tasks,
+                                           lambda chunk: swimlanes(chunk, issue_by_id))):
+            lines += [f"### {kind.capitalize()} ({len(items)})", ""]
+            if not items:
+                lines += ["_None_", ""]
+                continue
+            lines += render_items(items[:COLUMN_LIMIT])
+            if len(items) > COLUMN_LIMIT:
+                column_pages = render_pages(status, kind, items, render_items, pages_dir, board_name)
+                pages.update(column_pages)
+                lines += ["", f"_{len(items) - COLUMN_LIMIT} more — all {len(items)} in "
+                              f"[{len(column_pages)} page(s)]({pages_dir}/{page_name(status, kind, 1)})_"]
+            lines.append("")
 
     # Append minutes if present
     if minutes:
@@ -79,26 +188,63 @@ def render_markdown(title, issues, tasks, minutes):
             )
         lines.append("")
 
-    return "\n".join(lines)
+    return "\n".join(lines), pages
 
-def main():
-    issues = load_jsonl(DATA_DIR / "issues.jsonl")
-    tasks = load_jsonl(DATA_DIR / "tasks.jsonl")
-    minutes = load_today_minutes()
+def write_board(board_path, pages_dir, md, pages):
+    """Write an index and its overflow pages (in pages_dir, next to it),
+    dropping pages it no longer links to. Returns {output path: sha256}
+    for the build manifest."""
+    with open(board_path, "w") as f:
+        f.write(md)
+    outputs = {str(board_path): hashlib.sha256(md.encode()).hexdigest()}
+    if pages:
+        pages_dir.mkdir(parents=True, exist_ok=True)
+    for name, page in pages.items():
+        path = board_path.parent / name
+        with open(path, "w") as f:
+            f.write(page)
+        outputs[str(path)] = hashlib.sha256(page.encode()).hexdigest()
+    for stale in pages_dir.glob("*.md"):
+        if str(stale) not in outputs:
+            stale.unlink()
+    return outputs
 
-    KANBAN_DIR.mkdir(parents=True, exist_ok=True)
-    HISTORY_DIR.mkdir(parents=True, exist_ok=True)
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--force", action="store_true",
+                        help="Regenerate even if the inputs are unchanged.")
+    args = parser.parse_args()
 
     today = datetime.now().strftime("%Y-%m-%d")
     snapshot_path = HISTORY_DIR / f"{today}.md"
     current_path = KANBAN_DIR / "current.md"
 
-    md = render_markdown("Sprint Kanban", issues, tasks, minutes)
+    inputs = build_inputs()
+    if not args.force and is_up_to_date(load_manifest(), inputs):
+        print(f"Kanban up to date: {current_path}")
+        return
 
-    with open(current_path, "w") as f:
-        f.write(md)
-    with open(snapshot_path, "w") as f:
-        f.write(md)
+    issues = event_log.load_current("issue")
+    tasks = event_log.load_current("task")
+    minutes = load_today_minutes()
+
+    KANBAN_DIR.mkdir(parents=True, exist_ok=True)
+    HISTORY_DIR.mkdir(parents=True, exist_ok=True)
+
+    # The snapshot gets its own copy of the overflow pages, linked relative
+    # to it, so history boards stay complete after later builds
+    snapshot_pages = HISTORY_DIR / f"{today}-pages"
+    outputs = {}
+    outputs.update(write_board(current_path, PAGES_DIR,
+                               *render_board("Sprint Kanban", issues, tasks, minutes)))
+    outputs.update(write_board(snapshot_path, snapshot_pages,
+                               *render_board("Sprint Kanban", issues, tasks, minutes,
+                                             pages_dir=snapshot_pages.name, board_name=snapshot_path.name)))
+    manifest = {"inputs": inputs, "outputs": outputs}
+    with open(MANIFEST_PATH, "w") as f:
+        json.dump(manifest, f, indent=2)
+    catalog.register(current_path, "kanban", SPRINT_ID)
+    catalog.register(snapshot_path, "kanban_history", SPRINT_ID)
 
     print(f"Kanban generated:")
     print(f"- Current:   {current_path}")
@@ -0,0 +1,253 @@
+#!/usr/bin/env python3
+"""
+jsonl_index.py — Byte-offset index for canonical JSONL records
+
+Keeps a sidecar SQLite index next to each canonical JSONL file
+(data/.tasks.jsonl.idx) mapping record id to byte offset and length.
+A lookup is a primary-key query for just the requested ids, and the
+record is then read with a memory-mapped slice instead of parsing the
+whole file.
+
+The index remembers the file's size and mtime. When they change and the
+file has only grown (the last indexed record is byte-for-byte where it
+was), just the appended tail is scanned; otherwise the index is rebuilt.
+Every fetched slice must parse to a record with the requested id; an edit
+that the size and tail checks missed fails that check and forces a full
+rescan.
+
+Usage (prints the current record, pending transitions applied):
+    python scripts/jsonl_index.py S04.I01.T03
+"""
+
+import argparse
+import hashlib
+import json
+import mmap
+import re
+import sqlite3
+from pathlib import Path
+
+
+# === Paths ===
+DATA_DIR = Path("data")
+
+ID_PATTERNS = [
+    (re.compile(r"^S\d{2}\.I\d{2}\.T\d{2}$"), DATA_DIR / "tasks.jsonl"),
+    (re.compile(r"^S\d{2}\.I\d{2}$"), DATA_DIR / "issues.jsonl"),
+    (re.compile(r"^S\d{2}$"), DATA_DIR / "sprints.jsonl"),
+]
+
+# Canonical records lead with their id, so most lines never need a full parse
+LEADING_ID = re.compile(rb'^\s*\{\s*"id"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+
+# === Index maintenance ===
+INDEX_VERSION = 1
+SCHEMA = """
+CREATE TABLE records (
+    id     TEXT PRIMARY KEY,
+    offset INTEGER NOT NULL,
+    length INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX records_offset ON records (offset);
+CREATE TABLE source (
+    size     INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    tail     TEXT NOT NULL
+);
+"""
+
+# Ids per SELECT, safely under SQLite's bound-parameter limit
+FETCH_CHUNK = 500
+
+
+def index_path(path: Path) -> Path:
+    return path.with_name(f".{path.name}.idx")
+
+
+def line_id(line: bytes):
+    match = LEADING_ID.match(line)
+    if match:
+        return json.loads(b'"' + match.group(1) + b'"')
+    if not line.strip():
+        return None
+    return json.loads(line).get("id")
+
+
+def scan(path: Path, start: int = 0):
+    """Yield (id, offset, length) for every record from byte `start` on."""
+    with open(path, "rb") as f:
+        f.seek(start)
+        offset = start
+        for line in f:
+            record_id = line_id(line)
+            if record_id is not None:
+                yield record_id, offset, len(line.rstrip(b"\r\n"))
+            offset += len(line)
+
+
+def _tail_digest(conn, path: Path) -> str:
+    row = conn.execute("SELECT offset, length FROM records ORDER BY offset DESC LIMIT 1").fetchone()
+    if row is None:
+        return ""
+    offset, length = row
+    with open(path, "rb") as f:
+        f.seek(offset)
+        return hashlib.blake2b(f.read(length), digest_size=16).hexdigest()
+
+
+def _ends_with_newline(path: Path, size: int) -> bool:
+    if size == 0:
+        return True
+    with open(path, "rb") as f:
+        f.seek(size - 1)
+        return f.read(1) == b"\n"
+
+
+def _open(idx_path: Path):
+    conn = sqlite3.connect(idx_path, timeout=30, isolation_level=None)
+    try:
+        if conn.execute("PRAGMA user_version").fetchone()[0] != INDEX_VERSION:
+            conn.execute("BEGIN IMMEDIATE")
+            if conn.execute("PRAGMA user_version").fetchone()[0] != INDEX_VERSION:
+                conn.execute("DROP TABLE IF EXISTS records")
+                conn.execute("DROP TABLE IF EXISTS source")
+                for statement in SCHEMA.split(";"):
+                    if statement.strip():
+                        conn.execute(statement)
+                conn.execute(f"PRAGMA user_version = {INDEX_VERSION}")
+            conn.execute("COMMIT")
+    except BaseException:
+        conn.close()
+        raise
+    return conn
+
+
+def connect(path: Path):
+    """Open the index for path, replacing one that is not a usable database
+    (such as the JSON index earlier versions wrote)."""
+    idx_path = index_path(path)
+    try:
+        return _open(idx_path)
+    except sqlite3.DatabaseError as exc:
+        if isinstance(exc, sqlite3.OperationalError):
+            raise
+        idx_path.unlink(missing_ok=True)
+        return _open(idx_path)
+
+
+def refresh(conn, path: Path, rescan: bool = False):
+    """Bring the index up to date with path: nothing if the file is
+    unchanged, its appended tail if it only grew, a full rescan otherwise
+    (or always, with rescan)."""
+    stat = path.stat()
+    stamp = (stat.st_size, stat.st_mtime_ns)
+    row = conn.execute("SELECT size, mtime_ns, tail FROM source").fetchone()
+    if row and row[:2] == stamp and not rescan:
+        return
+
+    conn.execute("BEGIN IMMEDIATE")
+    try:
+        # Another process may have refreshed it while we waited
+        row = conn.execute("SELECT size, mtime_ns, tail FROM source").fetchone()
+        if row and row[:2] == stamp and not rescan:
+            conn.execute("COMMIT")
+            return
+        if not rescan and row and stat.st_size >= row[0] and _ends_with_newline(path, row[0]) \
+                and _tail_digest(conn, path) == row[2]:
+            start = row[0]
+        else:
+            conn.execute("DELETE FROM records")
+            start = 0
+        conn.executemany("INSERT OR REPLACE INTO records VALUES (?, ?, ?)", scan(path, start))
+        conn.execute("DELETE FROM source")
+        conn.execute("INSERT INTO source VALUES (?, ?, ?)", stamp + (_tail_digest(conn, path),))
+        conn.execute("COMMIT")
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+
+
+def offsets_for(path: Path, ids, rescan: bool = False) -> dict:
+    """Return {id: (offset, length)} for the requested ids indexed in path."""
+    ids = list(dict.fromkeys(ids))
+    offsets = {}
+    conn = connect(path)
+    try:
+        refresh(conn, path, rescan)
+        for i in range(0, len(ids), FETCH_CHUNK):
+            chunk = ids[i:i + FETCH_CHUNK]
+            marks = ",".join("?" * len(chunk))
+            for record_id, offset, length in conn.execute(
+                f"SELECT id, offset, length FROM records WHERE id IN ({marks})", chunk,
+            ):
+                offsets[record_id] = (offset, length)
+    finally:
+        conn.close()
+    return offsets
+
+
+# === Record access ===
+def read_records(path: Path, offsets: dict):
+    """Read {id: record} at the given offsets, or None if any slice does not
+    hold a record with that id (edits the stamp check could not see)."""
+    if not offsets:
+        return {}
+    records = {}
+    with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        for rid, (off, length) in offsets.items():
+            try:
+                record = json.loads(mm[off:off + length])
+            except ValueError:
+                return None
+            if not isinstance(record, dict) or record.get("id") != rid:
+                return None
+            records[rid] = record
+    return records
+
+
+def fetch_many(path: Path, ids) -> dict:
+    """Return {id: record} for the requested ids that exist in path."""
+    ids = list(ids)
+    records = read_records(path, offsets_for(path, ids))
+    if records is None:
+        # Stale offsets: rebuild the index from scratch and read again
+        records = read_records(path, offsets_for(path, ids, rescan=True))
+        if records is None:
+            raise ValueError(f"{path} changed while it was being read; retry")
+    return records
+
+
+def fetch(path: Path, record_id: str):
+    return fetch_many(path, [record_id]).get(record_id)
+
+
+def resolve_path(record_id: str) -> Path:
+    """Pick the canonical file for an S04 / S04.I01 / S04.I01.T03 id."""
+    for pattern, path in ID_PATTERNS:
+        if pattern.match(record_id):
+            return path
+    raise ValueError(f"Unrecognised record id '{record_id}'")
+
+
+def lookup(record_id: str):
+    return fetch(resolve_path(record_id), record_id)
+
+
+def main():
+    import event_log
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("ids", nargs="+", help="Record ids such as S04.I01.T03")
+    args = parser.parse_args()
+
+    for record_id in args.ids:
+        record = lookup(record_id)
+        if record is None:
+            raise SystemExit(f"ERROR: '{record_id}' not found")
+        event_log.apply_events([record], event_log.read_events(record_id=record_id))
+        print(json.dumps(record, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -1,13 +1,32 @@
 #!/usr/bin/env python3
 
+from __future__ import annotations
+
 import json
-import re
 import sys
+import hashlib
+import shutil
 import argparse
-import mlflow
-import pandas as pd
 from pathlib import Path
-from datetime import datetime
+
+import tracking
+
+# mlflow (via tracking's detached flush process) and pyarrow are imported on the
+# code paths that use them. numpy and pandas are imported by
+# import_dataframe_libs(): right away when this file is imported as a
+# module (and in spawned worker processes, which import it too), but only
+# after argument parsing when it runs as a script, so --help and usage
+# errors return without loading them.
+
+
+def import_dataframe_libs():
+    global np, pd
+    import numpy as np
+    import pandas as pd
+
+
+if __name__ != "__main__":
+    import_dataframe_libs()
 
 # -------------------------------------------------------------------
 # Paths
@@ -15,19 +34,21 @@ from datetime import datetime
 
 DATA_DIR = Path("data")
 REGISTRY_PATH = Path("frameworks/schema_registry.json")
+CACHE_PATH = DATA_DIR / ".validation_cache.json"
 
 # -------------------------------------------------------------------
 # Utility: load JSONL into DataFrame
 # -------------------------------------------------------------------
 
-def load_jsonl(path: Path) -> pd.DataFrame:
-    rows = []
+def read_jsonl_lines(path: Path) -> list:
     with open(path, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if line:
-                rows.append(json.loads(line))
-    return pd.DataFrame(rows)
+        return [line for line in (raw.strip() for raw in f) if line]
+
+
+def load_jsonl(path: Path, lines: list = None) -> pd.DataFrame:
+    if lines is None:
+        lines = read_jsonl_lines(path)
+    return pd.DataFrame([json.loads(line) for line in lines])
 
 # -------------------------------------------------------------------
 # Utility: load schema registry
@@ -38,145 +59,816 @@ def load_registry() -> dict:
         return json.load(f)
 
 # -------------------------------------------------------------------
-# Error helper
+# Incremental validation cache
+#
+# The cache maps each dataset's record id to the content hash of the
+# last version of that record that validated cleanly. It is only
+# trusted for the same registry_version and registry file contents.
 # -------------------------------------------------------------------
 
-def fail(msg: str):
-    print(f"VALIDATION ERROR: {msg}")
-    sys.exit(1)
+def record_hash(line: str) -> str:
+    return hashlib.blake2b(line.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def registry_fingerprint(registry: dict) -> dict:
+    with open(REGISTRY_PATH, "rb") as f:
+        digest = hashlib.sha256(f.read()).hexdigest()
+    return {"registry_version": registry["registry_version"], "registry_sha256": digest}
+
+
+def load_cache(fingerprint: dict) -> dict:
+    if not CACHE_PATH.exists():
+        return {}
+    try:
+        with open(CACHE_PATH, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    if {k: cache.get(k) for k in fingerprint} != fingerprint:
+        return {}
+    return cache.get("datasets", {})
+
+
+def save_cache(fingerprint: dict, datasets: dict):
+    payload = dict(fingerprint, datasets=datasets)
+    tmp_path = CACHE_PATH.with_suffix(".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(payload, f, separators=(",", ":"))
+    tmp_path.replace(CACHE_PATH)
+
+
+def changed_ids(df: pd.DataFrame, hashes: list, cached: dict) -> set:
+    """Ids that are new, edited, or removed since the cached run."""
+    if "id" not in df.columns:
+        return set(cached)
+    current = dict(zip(df["id"], hashes))
+    changed = {rid for rid, h in current.items() if cached.get(rid) != h}
+    changed.update(rid for rid in cached if rid not in current)
+    return changed
+
+
+def select_dirty(df: pd.DataFrame, hashes: list, cached: dict, schema: dict, changed: dict) -> np.ndarray:
+    """Rows that must be re-validated: new or edited records, plus records
+    whose foreign-key targets were added, edited or removed."""
+    if "id" not in df.columns or not cached:
+        return np.ones(len(df), dtype=bool)
+
+    dirty = df["id"].map(cached).to_numpy() != np.asarray(hashes, dtype=object)
+    for fk_field, target in schema.get("foreign_keys", {}).items():
+        if fk_field in df.columns:
+            table = target.split(".")[0]
+            dirty |= df[fk_field].isin(changed[table]).to_numpy()
+    return dirty
+
+
+def clean_hashes(df: pd.DataFrame, hashes: list, violations: list) -> dict:
+    """Hashes of records that carry no violation, for the next run's cache."""
+    if "id" not in df.columns or any(v["row"] is None for v in violations):
+        return {}
+    bad_rows = {v["row"] for v in violations}
+    return {
+        rid: h
+        for row, (rid, h) in enumerate(zip(df["id"], hashes))
+        if row not in bad_rows
+    }
 
 # -------------------------------------------------------------------
-# Timestamp parsing
+# Violation report
+#
+# Every check returns a list of violation dicts instead of exiting on
+# the first problem, so one run reports everything that is wrong.
 # -------------------------------------------------------------------
 
-def parse_timestamp(value: str) -> datetime:
-    cleaned = value.replace("Z", "+00:00")
-    try:
-        return datetime.fromisoformat(cleaned)
-    except Exception as e:
-        fail(f"Invalid timestamp '{value}': {e}")
+def violation(label: str, check: str, message: str, row=None, record_id=None) -> dict:
+    return {
+        "dataset": label,
+        "check": check,
+        "row": None if row is None else int(row),
+        "id": record_id,
+        "message": message,
+    }
+
+
+def report_violations(violations: list, report_path: Path = None):
+    if report_path is not None:
+        report_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(report_path, "w", encoding="utf-8") as f:
+            json.dump({"violations": violations}, f, indent=2)
+
+    for v in violations:
+        print(f"VALIDATION ERROR: {v['message']}")
+
+    if violations:
+        print(f"Validation failed: {len(violations)} violation(s).")
+        sys.exit(1)
 
 # -------------------------------------------------------------------
-# Status validation
+# Column helpers
 # -------------------------------------------------------------------
 
-def validate_status(status: str, allowed: list, label: str):
-    if status not in allowed:
-        fail(f"{label} invalid status '{status}' (allowed: {allowed})")
+def _record_ids(df: pd.DataFrame) -> pd.Series:
+    if "id" in df.columns:
+        return df["id"]
+    return pd.Series([None] * len(df), index=df.index)
+
+
+def _as_text(values: pd.Series) -> pd.Series:
+    if pd.api.types.is_string_dtype(values.dtype):
+        return values
+    return values.astype(str).where(values.notna())
+
+
+def _collect(df: pd.DataFrame, bad: np.ndarray, label: str, check: str, render) -> list:
+    positions = np.flatnonzero(bad)
+    ids = _record_ids(df).to_numpy()
+    return [
+        violation(label, check, render(pos), row=df.index[pos], record_id=ids[pos])
+        for pos in positions
+    ]
 
 # -------------------------------------------------------------------
-# Status history validation (corrected for Option A)
+# Status validation
 # -------------------------------------------------------------------
 
-def validate_status_history(record: dict, transitions: dict, label: str):
-    history = record.get("status_history")
+def check_status(df: pd.DataFrame, allowed: list, label: str) -> list:
+    if "status" not in df.columns:
+        return []
+    values = df["status"].to_numpy()
+    codes = pd.Index(allowed).get_indexer(values)
+    return _collect(
+        df, codes < 0, label, "status",
+        lambda pos: f"{label} invalid status '{values[pos]}' (allowed: {allowed})",
+    )
 
-    # Option A: history must exist and be non-empty
-    if not history:
-        fail(f"{label} missing or empty status_history")
+# -------------------------------------------------------------------
+# Status history validation (corrected for Option A)
+#
+# The workflow graph is compiled into an integer-coded transition
+# matrix and every history is exploded into one flat table of
+# (record, seq, status_code, epoch_ns), so illegal transitions,
+# non-increasing timestamps and final-status mismatches are each a
+# single NumPy pass over the whole dataset.
+# -------------------------------------------------------------------
 
-    last_time = None
+def compile_transitions(transitions: dict):
+    """Return (states, matrix): an Index of workflow states and a boolean
+    matrix where matrix[from_code, to_code] marks a legal transition."""
+    names = list(transitions)
+    for targets in transitions.values():
+        names.extend(t for t in targets if t not in names)
+    states = pd.Index(names)
+
+    matrix = np.zeros((len(states), len(states)), dtype=bool)
+    for from_s, targets in transitions.items():
+        matrix[states.get_loc(from_s), states.get_indexer(targets)] = True
+    return states, matrix
+
+
+def explode_histories(histories) -> dict:
+    """Flatten per-record histories into parallel arrays."""
+    lengths = np.fromiter(
+        (len(h) if isinstance(h, (list, np.ndarray)) else 0 for h in histories),
+        dtype=np.int64,
+        count=len(histories),
+    )
+    entries = [e for h in histories if isinstance(h, (list, np.ndarray)) for e in h]
+    starts = np.cumsum(lengths) - lengths
+
+    record = np.repeat(np.arange(len(histories)), lengths)
+    seq = np.arange(len(entries)) - np.repeat(starts, lengths)
+    status = np.array([e.get("status") for e in entries], dtype=object)
+    stamps = np.array([e.get("timestamp") for e in entries], dtype=object)
+    parsed = pd.to_datetime(pd.Series(stamps, dtype=object), utc=True,
+                            format="ISO8601", errors="coerce")
+
+    return {
+        "lengths": lengths,
+        "starts": starts,
+        "record": record,
+        "seq": seq,
+        "status": status,
+        "timestamp": stamps,
+        "epoch_ns": parsed.to_numpy(dtype="datetime64[ns]").view(np.int64),
+        "valid_ts": parsed.notna().to_numpy(),
+    }
 
-    # Validate transitions between consecutive entries
-    for i in range(1, len(history)):
-        prev = history[i - 1]
-        curr = history[i]
 
-        from_s = prev["status"]
-        to_s = curr["status"]
+def check_status_history(df: pd.DataFrame, transitions: dict, label: str) -> list:
+    n = len(df)
+    if "status_history" in df.columns:
+        histories = df["status_history"].to_numpy()
+    else:
+        histories = np.full(n, None, dtype=object)
+    record_status = df["status"].to_numpy() if "status" in df.columns else np.full(n, None)
 
-        # Check legal transitions
-        allowed_next = transitions.get(from_s, [])
-        if to_s not in allowed_next:
-            fail(f"{label} illegal transition {from_s} → {to_s}")
+    states, matrix = compile_transitions(transitions)
+    flat = explode_histories(histories)
+    codes = states.get_indexer(flat["status"])
 
-        # Check timestamps
-        ts_prev = parse_timestamp(prev["timestamp"])
-        ts_curr = parse_timestamp(curr["timestamp"])
-        if ts_curr <= ts_prev:
-            fail(f"{label} status_history timestamps must be strictly increasing")
+    # (record, order within record, message); order keeps each record's
+    # messages in history order, with the final-status check last
+    found = []
 
-        last_time = ts_curr
+    # Option A: history must exist and be non-empty
+    for pos in np.flatnonzero(flat["lengths"] == 0):
+        found.append((pos, -1, f"{label} missing or empty status_history"))
+
+    # Consecutive pairs within one record
+    curr = np.flatnonzero(flat["seq"] > 0)
+    prev = curr - 1
+    from_c, to_c = codes[prev], codes[curr]
+    known = (from_c >= 0) & (to_c >= 0)
+    legal = known & matrix[np.maximum(from_c, 0), np.maximum(to_c, 0)]
+    for i in np.flatnonzero(~legal):
+        found.append((
+            flat["record"][curr[i]], 3 * flat["seq"][curr[i]],
+            f"{label} illegal transition {flat['status'][prev[i]]} → {flat['status'][curr[i]]}",
+        ))
+
+    both_valid = flat["valid_ts"][prev] & flat["valid_ts"][curr]
+    for i in np.flatnonzero(~both_valid):
+        bad = prev[i] if not flat["valid_ts"][prev[i]] else curr[i]
+        found.append((
+            flat["record"][curr[i]], 3 * flat["seq"][curr[i]] + 1,
+            f"Invalid timestamp '{flat['timestamp'][bad]}': not an ISO-8601 date-time",
+        ))
+
+    ts = flat["epoch_ns"]
+    for i in np.flatnonzero(both_valid & (ts[curr] <= ts[prev])):
+        found.append((
+            flat["record"][curr[i]], 3 * flat["seq"][curr[i]] + 2,
+            f"{label} status_history timestamps must be strictly increasing",
+        ))
 
     # Final status must match last entry
-    final_status = history[-1]["status"]
-    if record.get("status") != final_status:
-        fail(
-            f"{label} final status '{record.get('status')}' "
-            f"does not match last transition '{final_status}'"
-        )
+    has_history = flat["lengths"] > 0
+    last = flat["starts"][has_history] + flat["lengths"][has_history] - 1
+    final_status = flat["status"][last]
+    mismatch = record_status[has_history] != final_status
+    for pos, final in zip(np.flatnonzero(has_history)[mismatch], final_status[mismatch]):
+        found.append((
+            pos, np.iinfo(np.int64).max,
+            f"{label} final status '{record_status[pos]}' "
+            f"does not match last transition '{final}'",
+        ))
+
+    found.sort(key=lambda item: (item[0], item[1]))
+    ids = _record_ids(df).to_numpy()
+    return [
+        violation(label, "status_history", message, row=df.index[pos], record_id=ids[pos])
+        for pos, _, message in found
+    ]
 
 # -------------------------------------------------------------------
 # Identifier pattern validation
 # -------------------------------------------------------------------
 
-def validate_id_pattern(df: pd.DataFrame, pattern: str, field: str, label: str):
-    regex = re.compile(pattern)
-    for _, row in df.iterrows():
-        value = row[field]
-        if not regex.match(value):
-            fail(f"{label} invalid {field} '{value}' does not match pattern {pattern}")
+def check_id_pattern(df: pd.DataFrame, pattern: str, field: str, label: str) -> list:
+    if field not in df.columns:
+        return []
+    values = df[field].to_numpy()
+    matched = _as_text(df[field]).str.fullmatch(pattern)
+    bad = ~matched.fillna(False).astype(bool).to_numpy()
+    return _collect(
+        df, bad, label, "id_pattern",
+        lambda pos: f"{label} invalid {field} '{values[pos]}' does not match pattern {pattern}",
+    )
 
 # -------------------------------------------------------------------
 # Required fields validation
 # -------------------------------------------------------------------
 
-def validate_required_fields(df: pd.DataFrame, required: list, label: str):
+def check_required_fields(df: pd.DataFrame, required: list, label: str) -> list:
     missing = [f for f in required if f not in df.columns]
     if missing:
-        fail(f"{label} missing required fields: {missing}")
+        return [violation(label, "required_fields", f"{label} missing required fields: {missing}")]
+    return []
 
 # -------------------------------------------------------------------
 # Foreign key validation
 # -------------------------------------------------------------------
 
-def validate_foreign_keys(df: pd.DataFrame, fk_map: dict, lookup: dict, label: str):
+def check_foreign_keys(df: pd.DataFrame, fk_map: dict, lookup: dict, label: str) -> list:
+    violations = []
     for fk_field, target in fk_map.items():
+        if fk_field not in df.columns:
+            continue
         table, field = target.split(".")
-        valid_values = lookup[table][field]
-        for _, row in df.iterrows():
-            if row[fk_field] not in valid_values:
-                fail(
-                    f"{label} invalid FK: {fk_field}='{row[fk_field]}' "
-                    f"not found in {target}"
-                )
+        values = df[fk_field].to_numpy()
+        valid = lookup[table][field]
+        if isinstance(valid, HashedIdSet):
+            bad = ~valid.isin(values)
+        else:
+            bad = ~df[fk_field].isin(valid).to_numpy()
+        violations.extend(_collect(
+            df, bad, label, "foreign_key",
+            lambda pos: (
+                f"{label} invalid FK: {fk_field}='{values[pos]}' "
+                f"not found in {target}"
+            ),
+        ))
+    return violations
+
+# -------------------------------------------------------------------
+# Partitioned Parquet output
+#
+# Each dataset is written as a Hive-style directory, one partition per
+# sprint (data/tasks/sprint=S04/part-0.parquet; sprints partition on
+# their own id). Rows are sorted by id and row groups carry min/max
+# statistics on id, status and timestamps. _manifest.json records a hash
+# per partition so only partitions whose records changed are rewritten.
+# -------------------------------------------------------------------
+
+PARTITION_COLUMNS = {"sprints": "id", "issues": "sprint", "tasks": "sprint"}
+STATS_COLUMNS = ["id", "status", "created_at", "updated_at", "start_date", "end_date"]
+ROW_GROUP_ROWS = 50_000
+PART_FILE = "part-0.parquet"
+
+
+def dataset_dir(name: str) -> Path:
+    return DATA_DIR / name
+
+
+def manifest_path(name: str) -> Path:
+    return dataset_dir(name) / "_manifest.json"
+
+
+def load_manifest(name: str) -> dict:
+    path = manifest_path(name)
+    if not path.exists():
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(name: str, partitions: dict, root: Path = None):
+    root = root or dataset_dir(name)
+    payload = {"partition_column": PARTITION_COLUMNS[name], "partitions": partitions}
+    with open(root / "_manifest.json", "w", encoding="utf-8") as f:
+        json.dump(payload, f, indent=2, sort_keys=True)
+
+
+def partition_path(name: str, key: str, root: Path = None) -> Path:
+    root = root or dataset_dir(name)
+    return root / f"{PARTITION_COLUMNS[name]}={key}" / PART_FILE
+
+
+def partition_hashes(df: pd.DataFrame, hashes: list, column: str) -> dict:
+    """Combined content hash and row count for every partition key."""
+    result = {}
+    for key, positions in df.groupby(column, sort=True).indices.items():
+        h = hashlib.blake2b(digest_size=16)
+        for pos in positions:
+            h.update(hashes[pos].encode("ascii"))
+        result[str(key)] = {"hash": h.hexdigest(), "rows": len(positions)}
+    return result
+
+
+def write_partition(table, path: Path):
+    import pyarrow.parquet as pq
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_suffix(".tmp")
+    stats = [c for c in STATS_COLUMNS if c in table.column_names]
+    pq.write_table(table, tmp_path, row_group_size=ROW_GROUP_ROWS, write_statistics=stats)
+    tmp_path.replace(path)
+
+
+def write_partitioned(name: str, df: pd.DataFrame, hashes: list) -> int:
+    """Rewrite only the partitions of `name` whose records changed.
+
+    Returns the number of partitions written.
+    """
+    import pyarrow as pa
+
+    column = PARTITION_COLUMNS[name]
+    previous = load_manifest(name).get("partitions", {})
+    current = partition_hashes(df, hashes, column)
+
+    written = 0
+    groups = df.groupby(column, sort=True).indices
+    for key, info in current.items():
+        path = partition_path(name, key)
+        if previous.get(key, {}).get("hash") == info["hash"] and path.exists():
+            continue
+        part = df.iloc[groups[key]].drop(columns=[column])
+        if "id" in part.columns:
+            part = part.sort_values("id", kind="stable")
+        write_partition(pa.Table.from_pandas(part, preserve_index=False), path)
+        written += 1
+
+    for key in set(previous) - set(current):
+        stale = partition_path(name, key)
+        stale.unlink(missing_ok=True)
+        if stale.parent.exists() and not any(stale.parent.iterdir()):
+            stale.parent.rmdir()
+
+    dataset_dir(name).mkdir(parents=True, exist_ok=True)
+    save_manifest(name, current)
+    return written
+
+
+def read_dataset(name: str, columns: list = None, sprints: list = None,
+                 skip_missing: bool = False) -> pd.DataFrame:
+    """Read a partitioned dataset, pruning to the given sprint partitions.
+
+    With skip_missing, requested columns absent from every partition are
+    left out instead of raising.
+    """
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+
+    column = PARTITION_COLUMNS[name]
+    dataset = ds.dataset(dataset_dir(name), format="parquet", partitioning="hive",
+                         exclude_invalid_files=True)
+    # Partitions are written independently, so a column that is empty in one
+    # of them (depends_on: list<null>) must be promoted across all of them
+    schema = pa.unify_schemas(
+        [f.physical_schema for f in dataset.get_fragments()] + [pa.schema([dataset.schema.field(column)])],
+        promote_options="permissive",
+    )
+    dataset = ds.dataset(dataset_dir(name), schema=schema, format="parquet", partitioning="hive",
+                         exclude_invalid_files=True)
+    if skip_missing and columns is not None:
+        columns = [c for c in columns if c in dataset.schema.names]
+    expr = ds.field(column).isin(sprints) if sprints is not None else None
+    table = dataset.to_table(columns=columns, filter=expr)
+    return table.to_pandas()
+
+# -------------------------------------------------------------------
+# Streaming mode
+#
+# --stream never holds a whole dataset in memory: records are validated
+# in batches of STREAM_BATCH_ROWS as lines are read and each batch is
+# written as one Parquet row group. Only the identifier sets needed for
+# foreign-key checks are kept, as sorted arrays of 64-bit digests.
+# Partitions are always rewritten in full, in file order.
+# -------------------------------------------------------------------
+
+STREAM_BATCH_ROWS = 50_000
+
+
+def id_digest(value) -> int:
+    data = str(value).encode("utf-8")
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "little")
+
+
+class HashedIdSet:
+    """Compact identifier set: 8 bytes per id, membership via binary search."""
+
+    def __init__(self):
+        self._chunks = []
+        self._digests = np.empty(0, dtype=np.uint64)
+
+    def add_all(self, values):
+        self._chunks.append(np.fromiter((id_digest(v) for v in values), dtype=np.uint64))
+
+    def freeze(self) -> "HashedIdSet":
+        self._digests = np.unique(np.concatenate([self._digests, *self._chunks]))
+        self._chunks = []
+        return self
+
+    def isin(self, values) -> np.ndarray:
+        probe = np.fromiter((id_digest(v) for v in values), dtype=np.uint64)
+        return np.isin(probe, self._digests)
+
+    def __len__(self):
+        return len(self._digests)
+
+
+def iter_batches(path: Path, size: int = STREAM_BATCH_ROWS):
+    """Yield lists of non-blank, stripped JSONL lines."""
+    batch = []
+    with open(path, "r", encoding="utf-8") as f:
+        for raw in f:
+            line = raw.strip()
+            if line:
+                batch.append(line)
+                if len(batch) >= size:
+                    yield batch
+                    batch = []
+    if batch:
+        yield batch
+
+
+def scan_ids(path: Path) -> HashedIdSet:
+    ids = HashedIdSet()
+    for batch in iter_batches(path):
+        ids.add_all(json.loads(line).get("id") for line in batch)
+    return ids.freeze()
+
+
+def conform_table(table, schema):
+    """Cast a batch to the unified schema, adding columns it lacks as nulls."""
+    import pyarrow as pa
+
+    columns = [
+        table[field.name] if field.name in table.column_names else pa.nulls(len(table), field.type)
+        for field in schema
+    ]
+    return pa.Table.from_arrays(columns, names=schema.names).cast(schema)
+
+
+def stream_dataset(name: str, schema: dict, lookup: dict, registry: dict, out_dir: Path = None):
+    """Validate one dataset batch by batch, optionally writing partitioned
+    Parquet row groups under out_dir.
+
+    Returns (record count, violations, HashedIdSet of the dataset's ids,
+    partition manifest). Each batch is first written as its own fragment
+    per partition. The schemas of all batches are unified (an all-empty
+    depends_on batch is list<null>, a later field may appear only in later
+    batches), and every partition's fragments are then merged into one
+    file under that schema, one row group per batch.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+
+    label = DATASETS[name]
+    column = PARTITION_COLUMNS[name]
+    ids = HashedIdSet()
+    violations = []
+    unified = None
+    fragments = {}
+    hashers = {}
+    rows = {}
+    count = 0
+
+    for n, lines in enumerate(iter_batches(DATA_DIR / f"{name}.jsonl")):
+        batch = [json.loads(line) for line in lines]
+        df = pd.DataFrame(batch, index=pd.RangeIndex(count, count + len(batch)))
+        violations += validate_dataset(df, schema, lookup, label, registry)
+        if "id" in df.columns:
+            ids.add_all(df["id"])
+        count += len(batch)
+
+        if out_dir is None or violations:
+            continue
+
+        keys = df[column].astype(str).to_numpy()
+        for key, line in zip(keys, lines):
+            hashers.setdefault(key, hashlib.blake2b(digest_size=16)).update(
+                record_hash(line).encode("ascii"))
+            rows[key] = rows.get(key, 0) + 1
+
+        table = pa.Table.from_pylist(batch)
+        unified = table.schema if unified is None else pa.unify_schemas(
+            [unified, table.schema], promote_options="permissive")
+        for key in sorted(set(keys)):
+            part = table.filter(pc.equal(table[column].cast(pa.string()), key))
+            path = partition_path(name, key, out_dir).with_name(f".batch-{n:06d}.parquet")
+            path.parent.mkdir(parents=True, exist_ok=True)
+            pq.write_table(part.drop_columns([column]), path)
+            fragments.setdefault(key, []).append(path)
+
+    if out_dir is not None and not violations:
+        part_schema = unified.remove(unified.get_field_index(column)) if unified is not None else None
+        stats = [c for c in STATS_COLUMNS if part_schema is not None and c in part_schema.names]
+        for key, paths in sorted(fragments.items()):
+            with pq.ParquetWriter(partition_path(name, key, out_dir), part_schema,
+                                  write_statistics=stats) as writer:
+                for path in paths:
+                    writer.write_table(conform_table(pq.read_table(path), part_schema),
+                                       row_group_size=ROW_GROUP_ROWS)
+                    path.unlink()
+
+    partitions = {
+        key: {"hash": hashers[key].hexdigest(), "rows": rows[key]}
+        for key in sorted(hashers)
+    }
+    return count, merge_violations(violations), ids.freeze(), partitions
+
+
+def stream_all(registry: dict, write_parquet: bool):
+    schemas = registry["schemas"]
+    lookup = {}
+    counts = {}
+    violations = []
+    manifests = {}
+
+    published = False
+    try:
+        for name in DATASETS:
+            schema = schemas[name]
+            for target in schema.get("foreign_keys", {}).values():
+                table = target.split(".")[0]
+                if table not in lookup:
+                    lookup[table] = {"id": scan_ids(DATA_DIR / f"{table}.jsonl")}
+
+            out_dir = DATA_DIR / f"{name}.tmp" if write_parquet else None
+            if out_dir is not None and out_dir.exists():
+                shutil.rmtree(out_dir)
+            count, found, ids, manifests[name] = stream_dataset(name, schema, lookup, registry, out_dir)
+            counts[name] = count
+            violations += found
+            lookup.setdefault(name, {"id": ids})
+
+        # Parquet is only published once every dataset has validated
+        if write_parquet and not violations:
+            for name in DATASETS:
+                out_dir = DATA_DIR / f"{name}.tmp"
+                out_dir.mkdir(parents=True, exist_ok=True)
+                save_manifest(name, manifests[name], out_dir)
+                if dataset_dir(name).exists():
+                    shutil.rmtree(dataset_dir(name))
+                out_dir.replace(dataset_dir(name))
+            published = True
+    finally:
+        # Violations or an exception: leave no half-written staging dirs behind
+        if write_parquet and not published:
+            for name in DATASETS:
+                shutil.rmtree(DATA_DIR / f"{name}.tmp", ignore_errors=True)
+
+    return counts, violations
 
 # -------------------------------------------------------------------
 # Dataset-level validation
 # -------------------------------------------------------------------
 
-def validate_dataset(df: pd.DataFrame, schema: dict, lookup: dict, label: str, registry: dict):
-    validate_required_fields(df, schema["required_fields"], label)
+def validate_dataset(df: pd.DataFrame, schema: dict, lookup: dict, label: str, registry: dict) -> list:
+    violations = check_required_fields(df, schema["required_fields"], label)
 
     id_field = schema["required_fields"][0]
-    validate_id_pattern(df, schema["id_pattern"], id_field, label)
+    violations += check_id_pattern(df, schema["id_pattern"], id_field, label)
 
-    allowed_status = schema["status_values"]
-    for _, row in df.iterrows():
-        validate_status(row["status"], allowed_status, label)
+    violations += check_status(df, schema["status_values"], label)
 
     if "foreign_keys" in schema:
-        validate_foreign_keys(df, schema["foreign_keys"], lookup, label)
+        violations += check_foreign_keys(df, schema["foreign_keys"], lookup, label)
 
     transitions = registry["workflow"]["allowed_transitions"]
-    for _, row in df.iterrows():
-        validate_status_history(row, transitions, label)
+    violations += check_status_history(df, transitions, label)
+
+    return violations
+
+# -------------------------------------------------------------------
+# Parallel validation
+#
+# --jobs N builds the FK lookup sets once and ships them to each worker
+# through the pool initializer. Each worker is then given a byte range of
+# a dataset's JSONL (plus the rows in it that need checking), reads and
+# parses that range itself, and sends back only its violation dicts, so
+# the parent never pickles DataFrames. Violations are merged into
+# check-then-row order, which is the order a single-process run produces,
+# so the report does not depend on N.
+# -------------------------------------------------------------------
+
+DATASETS = {"sprints": "Sprints", "issues": "Issues", "tasks": "Tasks"}
+CHECK_ORDER = ["required_fields", "id_pattern", "status", "foreign_key", "status_history"]
+PARALLEL_CHUNK_ROWS = 100_000
+
+_worker_state = {}
+
+
+def _init_worker(lookup: dict, registry: dict):
+    _worker_state["lookup"] = lookup
+    _worker_state["registry"] = registry
+
+
+def row_spans(path: Path, rows_per_chunk: int) -> list:
+    """(first_row, rows, start, end) for consecutive byte ranges of path
+    holding rows_per_chunk records each, with rows numbered the way
+    read_jsonl_lines numbers them (blank lines skipped)."""
+    spans = []
+    first = row = 0
+    start = offset = 0
+    with open(path, "rb") as f:
+        for raw in f:
+            if raw.strip():
+                if row - first == rows_per_chunk:
+                    spans.append((first, row - first, start, offset))
+                    first, start = row, offset
+                row += 1
+            offset += len(raw)
+    spans.append((first, row - first, start, offset))
+    return spans
+
+
+def _validate_range(name: str, path: str, start: int, end: int, first_row: int,
+                    rows, columns: list) -> tuple:
+    """Parse bytes [start, end) of a dataset file and validate the given
+    rows of it (all of them when rows is None)."""
+    with open(path, "rb") as f:
+        f.seek(start)
+        text = f.read(end - start).decode("utf-8")
+    lines = [line for line in (raw.strip() for raw in text.split("\n")) if line]
+    df = pd.DataFrame([json.loads(line) for line in lines],
+                      index=pd.RangeIndex(first_row, first_row + len(lines)))
+    # Same columns as the whole-file frame, whatever this range happens to contain
+    df = df.reindex(columns=columns)
+    if rows is not None:
+        df = df.loc[rows]
+    registry = _worker_state["registry"]
+    schema = registry["schemas"][name]
+    return name, validate_dataset(df, schema, _worker_state["lookup"], DATASETS[name], registry)
+
+
+def merge_violations(violations: list) -> list:
+    """Drop repeated dataset-level violations and order by check, then row."""
+    seen = set()
+    merged = []
+    for v in violations:
+        if v["row"] is None:
+            if v["message"] in seen:
+                continue
+            seen.add(v["message"])
+        merged.append(v)
+    merged.sort(key=lambda v: (CHECK_ORDER.index(v["check"]), -1 if v["row"] is None else v["row"]))
+    return merged
+
+
+def validate_all(frames: dict, lookup: dict, registry: dict, jobs: int = 1, paths: dict = None) -> dict:
+    """Validate every dataset frame; returns violations per dataset name.
+
+    Each frame holds rows of paths[name] (default data/<name>.jsonl),
+    indexed by their row position in that file; with jobs > 1 the workers
+    re-read those rows from the file.
+    """
+    schemas = registry["schemas"]
+    found = {name: [] for name in frames}
+
+    if jobs <= 1:
+        for name, df in frames.items():
+            found[name] = validate_dataset(df, schemas[name], lookup, DATASETS[name], registry)
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+
+        paths = paths or {name: DATA_DIR / f"{name}.jsonl" for name in frames}
+        tasks = []
+        for name, df in frames.items():
+            if len(df) == 0:
+                # Dataset-level checks (missing columns) still apply to an empty frame
+                found[name] = validate_dataset(df, schemas[name], lookup, DATASETS[name], registry)
+                continue
+            positions = df.index.to_numpy()
+            size = max(1, min(PARALLEL_CHUNK_ROWS, -(-len(df) // jobs)))
+            for first, count, start, end in row_spans(paths[name], size):
+                rows = positions[(positions >= first) & (positions < first + count)]
+                if len(rows) == 0:
+                    continue
+                tasks.append((name, str(paths[name]), start, end, first,
+                              None if len(rows) == count else rows, list(df.columns)))
+
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_init_worker,
+                                 initargs=(lookup, registry)) as pool:
+            futures = [pool.submit(_validate_range, *task) for task in tasks]
+            for future in futures:
+                name, chunk_violations = future.result()
+                found[name] += chunk_violations
+
+    return {name: merge_violations(v) for name, v in found.items()}
+
+# -------------------------------------------------------------------
+# Tracking
+# -------------------------------------------------------------------
+
+def log_registry(tracker, registry: dict):
+    schemas = registry["schemas"]
+    tracker.log_param("registry_version", registry["registry_version"])
+    tracker.log_param("sprints_schema_version", schemas["sprints"]["schema_version"])
+    tracker.log_param("issues_schema_version", schemas["issues"]["schema_version"])
+    tracker.log_param("tasks_schema_version", schemas["tasks"]["schema_version"])
+    tracker.log_artifact(str(REGISTRY_PATH))
+
+
+def log_violations(tracker, violations: list):
+    tracker.log_metric("validation_errors", len(violations))
+    if violations:
+        tracker.log_dict({"violations": violations}, "validation_report.json")
 
 # -------------------------------------------------------------------
 # Main pipeline
 # -------------------------------------------------------------------
 
+
 def main():
     parser = argparse.ArgumentParser()
     parser.add_argument("--validate-only", action="store_true")
+    parser.add_argument("--report", type=Path,
+                        help="Write the structured violation report to this JSON file.")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="Ignore the validation cache and re-check every record.")
+    parser.add_argument("--stream", action="store_true",
+                        help="Validate and convert in bounded memory, batch by batch "
+                             "(bypasses the validation cache).")
+    parser.add_argument("--jobs", type=int, default=1,
+                        help="Validate dataset chunks in N worker processes.")
+    parser.add_argument("--tracking", choices=tracking.SINKS, default=tracking.DEFAULT_SINK,
+                        help="Experiment-tracking sink (default: $KE_TRACKING or mlflow).")
     args = parser.parse_args()
+    import_dataframe_libs()
 
     registry = load_registry()
     schemas = registry["schemas"]
 
-    df_sprints = load_jsonl(DATA_DIR / "sprints.jsonl")
-    df_issues = load_jsonl(DATA_DIR / "issues.jsonl")
-    df_tasks = load_jsonl(DATA_DIR / "tasks.jsonl")
+    if args.stream:
+        main_stream(args, registry)
+        return
+
+    lines = {name: read_jsonl_lines(DATA_DIR / f"{name}.jsonl") for name in DATASETS}
+    frames = {name: load_jsonl(DATA_DIR / f"{name}.jsonl", lines[name]) for name in DATASETS}
+    hashes = {name: [record_hash(line) for line in lines[name]] for name in DATASETS}
+    df_sprints, df_issues, df_tasks = (frames[name] for name in DATASETS)
 
     lookup = {
         "sprints": {"id": set(df_sprints["id"])},
@@ -184,34 +876,74 @@ def main():
         "tasks": {"id": set(df_tasks["id"])}
     }
 
-    mlflow.set_experiment("schema_validation")
+    fingerprint = registry_fingerprint(registry)
+    cache = {} if args.no_cache else load_cache(fingerprint)
+    changed = {
+        name: changed_ids(frames[name], hashes[name], cache.get(name, {}))
+        for name in DATASETS
+    }
 
-    with mlflow.start_run(run_name="sprint04_validation"):
+    tracker = tracking.Tracker("schema_validation", "sprint04_validation", sink=args.tracking)
+    try:
+        log_registry(tracker, registry)
+
+        tracker.log_param("sprint_records", len(df_sprints))
+        tracker.log_param("issue_records", len(df_issues))
+        tracker.log_param("task_records", len(df_tasks))
 
-        mlflow.log_param("registry_version", registry["registry_version"])
-        mlflow.log_param("sprints_schema_version", schemas["sprints"]["schema_version"])
-        mlflow.log_param("issues_schema_version", schemas["issues"]["schema_version"])
-        mlflow.log_param("tasks_schema_version", schemas["tasks"]["schema_version"])
+        dirty_frames = {}
+        for name in DATASETS:
+            df = frames[name]
+            dirty = select_dirty(df, hashes[name], cache.get(name, {}), schemas[name], changed)
+            dirty_frames[name] = df[dirty]
+        rechecked = sum(len(df) for df in dirty_frames.values())
 
-        mlflow.log_param("sprint_records", len(df_sprints))
-        mlflow.log_param("issue_records", len(df_issues))
-        mlflow.log_param("task_records", len(df_tasks))
+        found = validate_all(dirty_frames, lookup, registry, args.jobs)
 
-        mlflow.log_artifact(str(REGISTRY_PATH))
+        violations = []
+        new_cache = {}
+        for name in DATASETS:
+            violations += found[name]
+            new_cache[name] = clean_hashes(frames[name], hashes[name], found[name])
 
-        validate_dataset(df_sprints, schemas["sprints"], lookup, "Sprints", registry)
-        validate_dataset(df_issues, schemas["issues"], lookup, "Issues", registry)
-        validate_dataset(df_tasks, schemas["tasks"], lookup, "Tasks", registry)
+        save_cache(fingerprint, new_cache)
+        tracker.log_metric("records_revalidated", rechecked)
+        log_violations(tracker, violations)
+        report_violations(violations, args.report)
 
         if args.validate_only:
             print("Validation passed. No Parquet written.")
             return
 
-        df_sprints.to_parquet(DATA_DIR / "sprints.parquet", index=False)
-        df_issues.to_parquet(DATA_DIR / "issues.parquet", index=False)
-        df_tasks.to_parquet(DATA_DIR / "tasks.parquet", index=False)
+        written = sum(write_partitioned(name, frames[name], hashes[name]) for name in DATASETS)
+        tracker.log_metric("partitions_written", written)
+
+        print(f"Validation passed. Parquet updated ({written} partition(s) rewritten).")
+    finally:
+        tracker.close()
+
+def main_stream(args, registry: dict):
+    tracker = tracking.Tracker("schema_validation", "sprint04_validation", sink=args.tracking)
+    try:
+        log_registry(tracker, registry)
+        tracker.log_param("validation_mode", "stream")
+
+        counts, violations = stream_all(registry, write_parquet=not args.validate_only)
+
+        tracker.log_param("sprint_records", counts["sprints"])
+        tracker.log_param("issue_records", counts["issues"])
+        tracker.log_param("task_records", counts["tasks"])
+
+        log_violations(tracker, violations)
+        report_violations(violations, args.report)
+
+        if args.validate_only:
+            print("Validation passed. No Parquet written.")
+            return
 
         print("Validation passed. Parquet regenerated.")
+    finally:
+        tracker.close()
 
 # -------------------------------------------------------------------
 
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""
+kanban_server.py — Local read-only Kanban and metrics server
+
+Keeps the canonical data parsed in memory and serves:
+
+    /              the Kanban board (generate_kanban.render_board)
+    /pages/<name>  the board's overflow pages
+    /metrics.json  extract_metrics.compute_metrics over the same data
+
+Before each request the server stats its inputs: data/*.jsonl, the
+transition event log, the artifact catalog (which changes when minutes are
+registered) and today's minutes. It reloads and re-renders only
+when one of them has changed. Every response carries a content-hash
+ETag, and a repeat view that sends If-None-Match gets 304 Not Modified.
+
+Usage:
+    python scripts/kanban_server.py [--host 127.0.0.1] [--port 8000]
+"""
+
+import argparse
+import hashlib
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+
+import catalog
+import event_log
+import extract_metrics
+import generate_kanban
+
+
+# === Inputs ===
+def input_paths() -> list:
+    minutes = generate_kanban.minutes_path()
+    return sorted(extract_metrics.DATA_DIR.glob("*.jsonl")) + [
+        event_log.LOG_PATH,
+        catalog.CATALOG_PATH,
+    ] + ([minutes] if minutes else [])
+
+
+def fingerprint() -> tuple:
+    """(path, size, mtime) for every input; missing files count as (path, None, None)."""
+    stamps = []
+    for path in input_paths():
+        try:
+            stat = path.stat()
+            stamps.append((str(path), stat.st_size, stat.st_mtime_ns))
+        except FileNotFoundError:
+            stamps.append((str(path), None, None))
+    return tuple(stamps)
+
+
+# === In-memory state ===
+def response(body: str, content_type: str) -> dict:
+    data = body.encode("utf-8")
+    return {
+        "body": data,
+        "etag": '"' + hashlib.blake2b(data, digest_size=16).hexdigest() + '"',
+        "content_type": content_type,
+    }
+
+
+class BoardState:
+    """Rendered responses for the current inputs, rebuilt when they change."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.stamp = None
+        self.routes = {}
+
+    def reload(self):
+        issues = event_log.load_current("issue")
+        tasks = event_log.load_current("task")
+        sprints = extract_metrics.load_jsonl(extract_metrics.DATA_DIR / "sprints.jsonl")
+        minutes = generate_kanban.load_today_minutes()
+
+        board, pages = generate_kanban.render_board("Sprint Kanban", issues, tasks, minutes)
+        metrics = extract_metrics.compute_metrics(sprints, pd.DataFrame(issues), pd.DataFrame(tasks))
+
+        markdown = "text/markdown; charset=utf-8"
+        routes = {"/": response(board, markdown)}
+        for name, page in pages.items():
+            routes[f"/{name}"] = response(page, markdown)
+        routes["/metrics.json"] = response(
+            json.dumps(metrics, indent=2, default=str), "application/json")
+        self.routes = routes
+
+    def get(self, path: str):
+        stamp = fingerprint()
+        with self.lock:
+            if stamp != self.stamp:
+                self.reload()
+                self.stamp = stamp
+            return self.routes.get(path)
+
+
+# === HTTP ===
+class Handler(BaseHTTPRequestHandler):
+    state = None
+
+    def do_GET(self):
+        path = self.path.split("?", 1)[0]
+        # Pages link back to the board as ../current.md
+        if path == "/current.md":
+            path = "/"
+        entry = self.state.get(path)
+        if entry is None:
+            self.send_error(404)
+            return
+
+        if self.headers.get("If-None-Match") == entry["etag"]:
+            self.send_response(304)
+            self.send_header("ETag", entry["etag"])
+            self.end_headers()
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", entry["content_type"])
+        self.send_header("Content-Length", str(len(entry["body"])))
+        self.send_header("ETag", entry["etag"])
+        self.send_header("Cache-Control", "no-cache")
+        self.end_headers()
+        self.wfile.write(entry["body"])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8000)
+    args = parser.parse_args()
+
+    Handler.state = BoardState()
+    server = ThreadingHTTPServer((args.host, args.port), Handler)
+    print(f"Serving Kanban on http://{args.host}:{args.port}/ (Ctrl-C to stop)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
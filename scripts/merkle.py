@@ -0,0 +1,404 @@
+#!/usr/bin/env python3
+"""
+merkle.py — Per-record Merkle trees over current issues and tasks
+
+Each record's current state (the canonical JSONL plus any pending
+event-log transitions) is hashed into a leaf. Leaves are ordered by id
+and folded pairwise up to a root.
+
+The tree is stored next to the data in SQLite
+(data/.tasks.jsonl.merkle.sqlite), one row per node position. Every
+status commit updates it by rehashing only the touched leaves and their
+paths to the root. It reads the siblings on the way up and rewrites just
+those O(changed · log n) rows, not the whole tree.
+
+Every node ever written also goes into a content-addressed node table in
+the same database, so earlier roots stay walkable. update_status.py logs
+the roots before and after each run. A diff between two roots looks up
+nodes one at a time and only descends into subtrees whose hashes differ.
+
+The tree tracks the canonical file's size and mtime. A canonical file
+edited by hand makes the tree stale. It is rebuilt on next use, under
+the event-log lock (event_log.current_root).
+
+Usage:
+    python scripts/merkle.py                             # current roots
+    python scripts/merkle.py --verify                    # full rebuild + compare
+    python scripts/merkle.py --verify S04.I01.T03        # check records' paths
+    python scripts/merkle.py --diff task ROOT_A ROOT_B   # ids changed between roots
+"""
+
+import argparse
+import hashlib
+import json
+import sqlite3
+from contextlib import contextmanager
+from pathlib import Path
+
+
+# === Hashing ===
+DIGEST_SIZE = 16
+LEAF_PREFIX = b"\x00"
+NODE_PREFIX = b"\x01"
+
+
+def leaf_hash(record: dict) -> str:
+    body = json.dumps(record, sort_keys=True, separators=(",", ":")).encode()
+    return hashlib.blake2b(LEAF_PREFIX + body, digest_size=DIGEST_SIZE).hexdigest()
+
+
+def node_hash(left: str, right: str) -> str:
+    data = NODE_PREFIX + bytes.fromhex(left) + bytes.fromhex(right)
+    return hashlib.blake2b(data, digest_size=DIGEST_SIZE).hexdigest()
+
+
+# === Paths ===
+def tree_path(path: Path) -> Path:
+    return path.with_name(f".{path.name}.merkle.sqlite")
+
+
+def stamp(path: Path) -> tuple:
+    stat = path.stat()
+    return stat.st_size, stat.st_mtime_ns
+
+
+# === Tree construction ===
+def parent_level(level: list, nodes: list) -> list:
+    """Fold one level pairwise; an odd last node is carried up unchanged."""
+    parents = []
+    for i in range(0, len(level) - 1, 2):
+        h = node_hash(level[i], level[i + 1])
+        nodes.append((h, None, level[i], level[i + 1]))
+        parents.append(h)
+    if len(level) % 2:
+        parents.append(level[-1])
+    return parents
+
+
+def build(records: list) -> tuple:
+    """Return (tree, new_nodes) for records sorted by id.
+
+    tree is {"ids": [...], "levels": [[leaf hashes], ..., [root]]}; nodes
+    are (hash, id, left, right) rows for the node table. An id that occurs
+    more than once keeps its last record, as the byte-offset index and
+    event replay do.
+    """
+    records = sorted({r["id"]: r for r in records}.values(), key=lambda r: r["id"])
+    leaves = [leaf_hash(r) for r in records]
+    nodes = [(h, r["id"], None, None) for h, r in zip(leaves, records)]
+    levels = [leaves]
+    while len(levels[-1]) > 1:
+        levels.append(parent_level(levels[-1], nodes))
+    return {"ids": [r["id"] for r in records], "levels": levels}, nodes
+
+
+def root(tree: dict) -> str:
+    top = tree["levels"][-1]
+    return top[0] if top else ""
+
+
+def level_sizes(leaves: int) -> list:
+    """Node count per level, leaves first, for a tree over `leaves` records."""
+    sizes = [leaves]
+    while sizes[-1] > 1:
+        sizes.append((sizes[-1] + 1) // 2)
+    return sizes
+
+
+# === Storage ===
+SCHEMA_VERSION = 1
+SCHEMA = """
+CREATE TABLE tree (
+    level INTEGER NOT NULL,
+    pos   INTEGER NOT NULL,
+    h     TEXT NOT NULL,
+    PRIMARY KEY (level, pos)
+) WITHOUT ROWID;
+CREATE TABLE leaves (
+    id  TEXT PRIMARY KEY,
+    pos INTEGER NOT NULL
+) WITHOUT ROWID;
+CREATE TABLE nodes (
+    h     TEXT PRIMARY KEY,
+    id    TEXT,
+    left  TEXT,
+    right TEXT
+) WITHOUT ROWID;
+CREATE TABLE source (
+    size     INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    leaves   INTEGER NOT NULL
+);
+"""
+
+
+@contextmanager
+def transaction(conn, mode: str = "IMMEDIATE"):
+    """BEGIN <mode> ... COMMIT, rolled back if the block raises."""
+    conn.execute(f"BEGIN {mode}")
+    try:
+        yield
+    except BaseException:
+        conn.execute("ROLLBACK")
+        raise
+    conn.execute("COMMIT")
+
+
+@contextmanager
+def connect(path: Path):
+    """The tree database for canonical file `path`, created on first use."""
+    conn = sqlite3.connect(tree_path(path), timeout=30, isolation_level=None)
+    try:
+        if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+            with transaction(conn):
+                if conn.execute("PRAGMA user_version").fetchone()[0] != SCHEMA_VERSION:
+                    for table in ("tree", "leaves", "nodes", "source"):
+                        conn.execute(f"DROP TABLE IF EXISTS {table}")
+                    for statement in SCHEMA.split(";"):
+                        if statement.strip():
+                            conn.execute(statement)
+                    conn.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+        yield conn
+    finally:
+        conn.close()
+
+
+def _leaf_count(conn, path: Path):
+    """Leaves in the stored tree, or None if it is missing or stale."""
+    row = conn.execute("SELECT size, mtime_ns, leaves FROM source").fetchone()
+    return row[2] if row and row[:2] == stamp(path) else None
+
+
+def _root(conn, leaves: int) -> str:
+    row = conn.execute("SELECT h FROM tree WHERE level = ? AND pos = 0",
+                       (len(level_sizes(leaves)) - 1,)).fetchone()
+    return row[0] if row else ""
+
+
+def _hash_at(conn, level: int, pos: int) -> str:
+    return conn.execute("SELECT h FROM tree WHERE level = ? AND pos = ?", (level, pos)).fetchone()[0]
+
+
+def _set_stamp(conn, path: Path, leaves: int):
+    conn.execute("DELETE FROM source")
+    conn.execute("INSERT INTO source VALUES (?, ?, ?)", stamp(path) + (leaves,))
+
+
+def _add_nodes(conn, nodes: list):
+    conn.executemany("INSERT OR IGNORE INTO nodes VALUES (?, ?, ?, ?)", nodes)
+
+
+def _save(conn, path: Path, tree: dict, nodes: list):
+    conn.execute("DELETE FROM tree")
+    conn.execute("DELETE FROM leaves")
+    conn.executemany("INSERT INTO leaves VALUES (?, ?)", ((rid, i) for i, rid in enumerate(tree["ids"])))
+    conn.executemany("INSERT INTO tree VALUES (?, ?, ?)",
+                     ((k, i, h) for k, level in enumerate(tree["levels"]) for i, h in enumerate(level)))
+    _add_nodes(conn, nodes)
+    _set_stamp(conn, path, len(tree["ids"]))
+
+
+def _update_leaf(conn, leaves: int, i: int, h: str, nodes: list):
+    """Replace leaf i and rehash its path to the root, reading only siblings."""
+    conn.execute("UPDATE tree SET h = ? WHERE level = 0 AND pos = ?", (h, i))
+    sizes = level_sizes(leaves)
+    for k in range(1, len(sizes)):
+        left = i - i % 2
+        if left + 1 < sizes[k - 1]:
+            if i == left:
+                pair = (h, _hash_at(conn, k - 1, i + 1))
+            else:
+                pair = (_hash_at(conn, k - 1, left), h)
+            h = node_hash(*pair)
+            nodes.append((h, None) + pair)
+        i //= 2
+        conn.execute("UPDATE tree SET h = ? WHERE level = ? AND pos = ?", (h, k, i))
+
+
+def stored_root(path: Path):
+    """Root of the stored tree for canonical file `path`, or None if missing or stale."""
+    if not tree_path(path).exists():
+        return None
+    with connect(path) as conn, transaction(conn, "DEFERRED"):
+        leaves = _leaf_count(conn, path)
+        return None if leaves is None else _root(conn, leaves)
+
+
+def stored_tree(path: Path) -> dict:
+    """The whole stored tree in build()'s shape, for a full comparison."""
+    with connect(path) as conn, transaction(conn, "DEFERRED"):
+        leaves = conn.execute("SELECT leaves FROM source").fetchone()
+        sizes = level_sizes(leaves[0] if leaves else 0)
+        ids = [rid for (rid,) in conn.execute("SELECT id FROM leaves ORDER BY pos")]
+        levels = [[h for (h,) in conn.execute("SELECT h FROM tree WHERE level = ? ORDER BY pos", (k,))]
+                  for k in range(len(sizes))]
+    return {"ids": ids, "levels": levels}
+
+
+def ensure(path: Path, load_records) -> str:
+    """Return the current root, rebuilding the tree from load_records() if
+    stale. Caller holds the event-log lock."""
+    with connect(path) as conn, transaction(conn):
+        leaves = _leaf_count(conn, path)
+        if leaves is not None:
+            return _root(conn, leaves)
+        tree, nodes = build(load_records())
+        _save(conn, path, tree, nodes)
+        return root(tree)
+
+
+def update(path: Path, records: dict, load_records) -> str:
+    """Fold changed records ({id: current record}) into the stored tree and
+    return the new root. Caller holds the event-log lock.
+
+    New or unknown ids change the leaf order, so they fall back to a rebuild.
+    """
+    with connect(path) as conn, transaction(conn):
+        leaves = _leaf_count(conn, path)
+        positions = {}
+        if leaves is not None:
+            for rid in records:
+                row = conn.execute("SELECT pos FROM leaves WHERE id = ?", (rid,)).fetchone()
+                if row is None:
+                    break
+                positions[rid] = row[0]
+        if leaves is None or len(positions) < len(records):
+            tree, nodes = build(load_records())
+            _save(conn, path, tree, nodes)
+            return root(tree)
+        nodes = []
+        for rid, record in records.items():
+            h = leaf_hash(record)
+            nodes.append((h, rid, None, None))
+            _update_leaf(conn, leaves, positions[rid], h, nodes)
+        _add_nodes(conn, nodes)
+        _set_stamp(conn, path, leaves)
+        return _root(conn, leaves)
+
+
+def restamp(path: Path, fresh: bool):
+    """After a rewrite that kept every record's state (compaction), carry a
+    tree that was fresh beforehand over to the new file."""
+    if not fresh:
+        return
+    with connect(path) as conn, transaction(conn):
+        row = conn.execute("SELECT leaves FROM source").fetchone()
+        if row:
+            _set_stamp(conn, path, row[0])
+
+
+# === Integrity ===
+def verify_records(path: Path, records: dict) -> list:
+    """Check the given records against the stored tree along their paths to
+    the root. Returns the ids that do not match."""
+    bad = []
+    with connect(path) as conn, transaction(conn, "DEFERRED"):
+        leaves = _leaf_count(conn, path)
+        sizes = level_sizes(leaves or 0)
+        for rid, record in records.items():
+            row = conn.execute("SELECT pos FROM leaves WHERE id = ?", (rid,)).fetchone()
+            if leaves is None or row is None:
+                bad.append(rid)
+                continue
+            i = row[0]
+            if leaf_hash(record) != _hash_at(conn, 0, i):
+                bad.append(rid)
+                continue
+            for k in range(1, len(sizes)):
+                left = i - i % 2
+                if left + 1 < sizes[k - 1]:
+                    expected = node_hash(_hash_at(conn, k - 1, left), _hash_at(conn, k - 1, left + 1))
+                else:
+                    expected = _hash_at(conn, k - 1, left)
+                i //= 2
+                if _hash_at(conn, k, i) != expected:
+                    bad.append(rid)
+                    break
+    return bad
+
+
+def node(conn, h: str):
+    """A stored node as {"h", "id"} (leaf) or {"h", "c": [left, right]}, or None."""
+    row = conn.execute("SELECT id, left, right FROM nodes WHERE h = ?", (h,)).fetchone()
+    if row is None:
+        return None
+    rid, left, right = row
+    return {"h": h, "id": rid} if rid is not None else {"h": h, "c": [left, right]}
+
+
+def diff(conn, root_a: str, root_b: str) -> list:
+    """Ids whose record state differs between two roots."""
+    a_leaves, b_leaves = {}, {}
+
+    def leaves(h, out):
+        found = node(conn, h)
+        if found is None:
+            raise KeyError(f"Unknown Merkle node {h}")
+        if "id" in found:
+            out[found["id"]] = h
+        else:
+            for child in found["c"]:
+                leaves(child, out)
+
+    def walk(a, b):
+        if a == b:
+            return
+        node_a, node_b = node(conn, a) if a else None, node(conn, b) if b else None
+        if node_a and node_b and "c" in node_a and "c" in node_b:
+            for child_a, child_b in zip(node_a["c"], node_b["c"]):
+                walk(child_a, child_b)
+            return
+        if a:
+            leaves(a, a_leaves)
+        if b:
+            leaves(b, b_leaves)
+
+    walk(root_a, root_b)
+    # Unaligned subtrees (records added or removed) can surface identical leaves on both sides
+    return sorted(rid for rid in a_leaves.keys() | b_leaves.keys()
+                  if a_leaves.get(rid) != b_leaves.get(rid))
+
+
+def main():
+    import event_log
+    import jsonl_index
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--verify", nargs="*", metavar="ID",
+                        help="Rebuild and compare the trees, or check only the given record ids.")
+    parser.add_argument("--diff", nargs=3, metavar=("ENTITY", "ROOT_A", "ROOT_B"),
+                        help="List record ids that changed between two roots.")
+    args = parser.parse_args()
+
+    if args.diff:
+        entity, root_a, root_b = args.diff
+        with connect(event_log.CANONICAL_FILES[entity]) as conn:
+            for rid in diff(conn, root_a, root_b):
+                print(rid)
+        return
+
+    failed = False
+    for entity, path in event_log.CANONICAL_FILES.items():
+        current = event_log.current_root(entity)
+        if args.verify is None:
+            print(f"{entity}: {current}")
+        elif args.verify:
+            ids = [rid for rid in args.verify if jsonl_index.resolve_path(rid) == path]
+            if not ids:
+                continue
+            records = event_log.load_current_records(entity, ids)
+            bad = verify_records(path, records) + [rid for rid in ids if rid not in records]
+            for rid in ids:
+                print(f"{entity}:{rid}: {'MISMATCH' if rid in bad else 'ok'}")
+            failed |= bool(bad)
+        else:
+            rebuilt, _ = build(event_log.load_current(entity))
+            ok = rebuilt == stored_tree(path)
+            print(f"{entity}: {'ok' if ok else 'MISMATCH'} {root(rebuilt)}")
+            failed |= not ok
+    if failed:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
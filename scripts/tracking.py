@@ -0,0 +1,186 @@
+"""
+tracking.py — Buffered, detached experiment tracking
+
+Scripts record params, metrics, artifacts and structured dicts on a
+Tracker instead of calling mlflow directly. Nothing is written while the
+script works. close() sends everything as one batched write
+(log_params/log_metrics in chunks within MLflow's per-request limits,
+plus one JSON artifact per dict).
+
+For the mlflow sink, close() only spools the payload to
+reports/tracking/.spool/ and starts a detached `tracking.py --flush`
+process to deliver it, so the calling script exits without waiting for
+`import mlflow` or the tracking server. A spool whose flush failed is
+kept as *.failed next to a *.log with the error; retry every spooled run
+with `python scripts/tracking.py --flush`.
+
+Sinks:
+- mlflow   the default
+- file     reports/tracking/<experiment>/<timestamp>-<run>.json, for offline runs
+- none     discard
+
+Select one with --tracking or the KE_TRACKING environment variable.
+"""
+
+import argparse
+import json
+import os
+import subprocess
+import sys
+from datetime import datetime
+from pathlib import Path
+
+
+# === Configuration ===
+SINKS = ["mlflow", "file", "none"]
+DEFAULT_SINK = os.environ.get("KE_TRACKING", "mlflow")
+FILE_SINK_DIR = Path("reports") / "tracking"
+SPOOL_DIR = FILE_SINK_DIR / ".spool"
+
+# Sinks flushed by a detached process rather than inside close()
+DETACHED_SINKS = {"mlflow"}
+
+# MLflow accepts at most 100 params and 1000 metrics per batch request
+MLFLOW_PARAM_BATCH = 100
+MLFLOW_METRIC_BATCH = 1000
+
+
+# === Sinks ===
+def _chunks(items: dict, size: int):
+    items = list(items.items())
+    for start in range(0, len(items), size):
+        yield dict(items[start:start + size])
+
+
+def flush_mlflow(payload: dict):
+    import mlflow
+
+    mlflow.set_experiment(payload["experiment"])
+    with mlflow.start_run(run_name=payload["run_name"]):
+        for chunk in _chunks(payload["params"], MLFLOW_PARAM_BATCH):
+            mlflow.log_params(chunk)
+        for chunk in _chunks(payload["metrics"], MLFLOW_METRIC_BATCH):
+            mlflow.log_metrics(chunk)
+        for path in payload["artifacts"]:
+            mlflow.log_artifact(path)
+        for name, data in payload["dicts"].items():
+            mlflow.log_dict(data, name)
+
+
+def flush_file(payload: dict):
+    out_dir = FILE_SINK_DIR / payload["experiment"]
+    out_dir.mkdir(parents=True, exist_ok=True)
+    ts = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    with open(out_dir / f"{ts}-{payload['run_name']}.json", "w") as f:
+        json.dump(payload, f, indent=2, default=str)
+
+
+FLUSHERS = {"mlflow": flush_mlflow, "file": flush_file, "none": lambda payload: None}
+
+
+# === Spool ===
+def spool(payload: dict) -> Path:
+    """Write a payload for a detached flush; artifact paths are made absolute."""
+    SPOOL_DIR.mkdir(parents=True, exist_ok=True)
+    payload = dict(payload, artifacts=[str(Path(p).resolve()) for p in payload["artifacts"]])
+    ts = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    path = SPOOL_DIR / f"{ts}-{os.getpid()}-{payload['run_name']}.json"
+    tmp_path = path.with_suffix(".tmp")
+    with open(tmp_path, "w") as f:
+        json.dump(payload, f, default=str)
+    tmp_path.replace(path)
+    return path
+
+
+def spawn_flush(path: Path):
+    """Start `tracking.py --flush path` in its own session and return at once."""
+    with open(path.with_suffix(".log"), "a") as log:
+        subprocess.Popen(
+            [sys.executable, str(Path(__file__).resolve()), "--flush", str(path)],
+            stdin=subprocess.DEVNULL, stdout=log, stderr=log, start_new_session=True,
+        )
+
+
+def flush_spooled(path: Path, sink: str = "mlflow") -> bool:
+    """Deliver one spooled payload; on failure keep it as *.failed."""
+    try:
+        with open(path, "r") as f:
+            payload = json.load(f)
+        FLUSHERS[sink](payload)
+    except Exception as e:
+        print(f"tracking ({sink}) failed for {path.name}: {e}", file=sys.stderr)
+        if path.exists():
+            path.replace(path.with_suffix(".failed"))
+        return False
+    path.unlink()
+    path.with_suffix(".log").unlink(missing_ok=True)
+    return True
+
+
+# === Tracker ===
+class Tracker:
+    """Buffers one tracking run and flushes it when closed."""
+
+    def __init__(self, experiment: str, run_name: str, sink: str = None):
+        sink = sink or DEFAULT_SINK
+        if sink not in SINKS:
+            raise ValueError(f"Unknown tracking sink '{sink}' (choose from {SINKS})")
+        self.sink = sink
+        self.payload = {
+            "experiment": experiment,
+            "run_name": run_name,
+            "started_at": datetime.now().isoformat(),
+            "params": {},
+            "metrics": {},
+            "artifacts": [],
+            "dicts": {},
+        }
+
+    # --- buffering ---
+    def log_param(self, key: str, value):
+        self.payload["params"][key] = value
+
+    def log_params(self, params: dict):
+        self.payload["params"].update(params)
+
+    def log_metric(self, key: str, value):
+        self.payload["metrics"][key] = value
+
+    def log_artifact(self, path):
+        self.payload["artifacts"].append(str(path))
+
+    def log_dict(self, data: dict, name: str):
+        self.payload["dicts"][name] = data
+
+    # --- flushing ---
+    def close(self):
+        """Flush the buffered run; detached sinks are handed to a background process."""
+        try:
+            if self.sink in DETACHED_SINKS:
+                spawn_flush(spool(self.payload))
+            else:
+                FLUSHERS[self.sink](self.payload)
+        except Exception as e:  # tracking must never fail the caller's write
+            print(f"WARNING: tracking ({self.sink}) failed: {e}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Deliver spooled tracking runs to MLflow.")
+    parser.add_argument("--flush", nargs="*", metavar="SPOOL",
+                        help="Spool files to flush (default: every pending or failed spool).")
+    args = parser.parse_args()
+    if args.flush is None:
+        parser.error("nothing to do; pass --flush")
+
+    paths = [Path(p) for p in args.flush]
+    if not paths and SPOOL_DIR.exists():
+        for failed in SPOOL_DIR.glob("*.failed"):
+            failed.replace(failed.with_suffix(".json"))
+        paths = sorted(SPOOL_DIR.glob("*.json"))
+    failures = sum(not flush_spooled(path) for path in paths)
+    if failures:
+        raise SystemExit(f"{failures} of {len(paths)} spooled run(s) failed")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,46 +1,44 @@
 #!/usr/bin/env python3
 import argparse
 import json
-import hashlib
+import os
 from datetime import datetime, timezone
 from pathlib import Path
 import sys
 import shutil
-import mlflow
+
+import catalog
+import event_log
+import tracking
+
+# Heavy dependencies (mlflow) are imported only by tracking's detached flush
+# process, so --help and argument errors return without paying for them, and
+# importing this module has no filesystem side effects.
 
 DATA_DIR = Path("data")
 REGISTRY_PATH = Path("frameworks/schema_registry.json")
+REPORTS_ROOT = Path("reports")
 
-# Sprint is passed in by Makefile via env or defaults here
-SPRINT_ID = Path(sys.argv[0]).parent.parent.joinpath(".sprint").read_text().strip() \
-    if Path(".sprint").exists() else "sprint-04"
+ENTITIES = ["issue", "task"]
 
-REPORTS_DIR = Path("reports") / SPRINT_ID
-MINUTES_DIR = REPORTS_DIR / "minutes"
-TRANSACTIONS_DIR = REPORTS_DIR / "transactions"
-MINUTES_DIR.mkdir(parents=True, exist_ok=True)
-TRANSACTIONS_DIR.mkdir(parents=True, exist_ok=True)
+# Commit attempts before giving up when other writers keep touching the same records
+MAX_COMMIT_ATTEMPTS = 5
 
-def load_jsonl(path):
-    with open(path, "r") as f:
-        return [json.loads(line) for line in f]
+def current_sprint():
+    # Sprint is passed in by Makefile via env or defaults here
+    if Path(".sprint").exists():
+        return Path(sys.argv[0]).parent.parent.joinpath(".sprint").read_text().strip()
+    return "sprint-04"
 
-def save_jsonl(path, records):
-    with open(path, "w") as f:
-        for r in records:
-            f.write(json.dumps(r, separators=(",", ":")) + "\n")
+def sprint_dir(sprint, name):
+    path = REPORTS_ROOT / sprint / name
+    path.mkdir(parents=True, exist_ok=True)
+    return path
 
 def load_registry():
     with open(REGISTRY_PATH, "r") as f:
         return json.load(f)
 
-def sha256_file(path):
-    h = hashlib.sha256()
-    with open(path, "rb") as f:
-        for chunk in iter(lambda: f.read(8192), b""):
-            h.update(chunk)
-    return h.hexdigest()
-
 def next_timestamp(last_ts):
     now = datetime.now(timezone.utc)
     if last_ts is None:
@@ -103,18 +101,19 @@ def read_batch_from_file(path):
             updates.append(parse_line(line))
     return updates
 
-def archive_batch_file(path):
-    ts = datetime.now().strftime("%Y%m%d-%H%M%S")
-    dest = TRANSACTIONS_DIR / f"{ts}-updates.txt"
+def archive_batch_file(path, sprint):
+    ts = datetime.now().strftime("%Y%m%d-%H%M%S-%f")
+    dest = sprint_dir(sprint, "transactions") / f"{ts}-updates.txt"
     shutil.copy(path, dest)
     return dest
 
-def save_minutes_pending(updates):
+def save_minutes_pending(updates, sprint):
     ts = datetime.now(timezone.utc).isoformat()
-    pending_path = MINUTES_DIR / "pending.json"
+    # One pending file per run, so concurrent standups do not overwrite each other
+    pending_path = sprint_dir(sprint, "minutes") / f"pending-{os.getpid()}.json"
     payload = {
         "captured_at": ts,
-        "sprint": SPRINT_ID,
+        "sprint": sprint,
         "updates": updates,
     }
     with open(pending_path, "w") as f:
@@ -125,23 +124,61 @@ def finalize_minutes(pending_path):
     if not pending_path.exists():
         return None
     today = datetime.now().strftime("%Y-%m-%d")
-    final_path = MINUTES_DIR / f"{today}.json"
-    pending_path.replace(final_path)
+    final_path = pending_path.parent / f"{today}.json"
+    # Later runs on the same day add their updates to the day's minutes
+    with event_log.locked():
+        with open(pending_path, "r") as f:
+            minutes = json.load(f)
+        if final_path.exists():
+            with open(final_path, "r") as f:
+                earlier = json.load(f)
+            minutes["updates"] = earlier.get("updates", []) + minutes["updates"]
+        event_log.write_atomic(final_path, json.dumps(minutes, indent=2))
+        catalog.register(final_path, "minutes", minutes["sprint"])
+        pending_path.unlink()
     return final_path
 
-def main():
-    parser = argparse.ArgumentParser()
-    parser.add_argument("--batch", action="store_true",
-                        help="Force interactive batch mode.")
-    parser.add_argument("--file", type=str,
-                        help="Path to a batch file containing updates.")
-    parser.add_argument("entity", nargs="?", choices=["issue", "task"])
-    parser.add_argument("id", nargs="?")
-    parser.add_argument("status", nargs="?")
-    parser.add_argument("actor", nargs="?")
-    parser.add_argument("reason", nargs="?")
-    args = parser.parse_args()
+def plan_transitions(updates, transitions):
+    """Validate updates against the current records and build their events.
+
+    Returns (events, expected), where expected maps each touched record to
+    the version it was read at.
+    """
+    for u in updates:
+        if u["entity"] not in ENTITIES:
+            raise SystemExit(f"ERROR: Unknown entity '{u['entity']}' for {u['id']} (expected one of {ENTITIES})")
+
+    # Current state of just the touched records: indexed fetch from the
+    # canonical JSONL + transitions not yet compacted
+    records = {
+        entity: event_log.load_current_records(
+            entity, [u["id"] for u in updates if u["entity"] == entity])
+        for entity in ENTITIES
+    }
+
+    # Validate all transitions first
+    for u in updates:
+        rec = records[u["entity"]].get(u["id"])
+        if rec is None:
+            raise SystemExit(f"ERROR: {u['entity']} '{u['id']}' not found")
+        old_status = rec["status"]
+        if u["status"] not in transitions.get(old_status, []):
+            raise SystemExit(f"ERROR: Illegal transition {old_status} → {u['status']} for {u['id']}")
+
+    expected = {
+        event_log.record_key(u["entity"], u["id"]): event_log.record_version(records[u["entity"]][u["id"]])
+        for u in updates
+    }
 
+    # Apply updates
+    events = []
+    for u in updates:
+        rec = records[u["entity"]][u["id"]]
+        old, _ = update_status(rec, u["status"], u["actor"], u["reason"])
+        events.append(event_log.make_event(u["entity"], u["id"], old, rec["status_history"][-1]))
+    return events, expected
+
+def run(args, sprint, tracker):
     registry = load_registry()
     transitions = registry["workflow"]["allowed_transitions"]
 
@@ -151,7 +188,7 @@ def main():
         if not batch_path.exists():
             raise SystemExit(f"ERROR: Batch file not found: {args.file}")
         updates = read_batch_from_file(batch_path)
-        archived = archive_batch_file(batch_path)
+        archived = archive_batch_file(batch_path, sprint)
         print(f"Batch file archived to {archived}")
 
     elif args.entity is None or args.batch:
@@ -172,50 +209,65 @@ def main():
         print("No updates provided.")
         return
 
-    pending_path = save_minutes_pending(updates)
+    tracker.log_param("sprint", sprint)
+    tracker.log_param("num_updates", len(updates))
+
+    # Merkle roots identify the record state; `merkle.py --diff` lists what
+    # changed between any two logged roots
+    for entity in ENTITIES:
+        tracker.log_param(f"{entity}s_merkle_root_before", event_log.current_root(entity))
+
+    # Optimistic: plan against an unlocked read, then commit only if the
+    # touched records are unchanged; re-plan when another writer got there first
+    for attempt in range(1, MAX_COMMIT_ATTEMPTS + 1):
+        events, expected = plan_transitions(updates, transitions)
+        try:
+            event_log.submit(events, expected)
+            break
+        except event_log.ConflictError as e:
+            if attempt == MAX_COMMIT_ATTEMPTS:
+                raise SystemExit(f"ERROR: {e} (gave up after {attempt} attempts)")
+            print(f"{e}; retrying")
+
+    for e in events:
+        print(f"{e['entity']}:{e['id']}: {e['from']} → {e['status']} at {e['timestamp']}")
+
+    # Minutes record committed decisions only, so a run that fails before
+    # this point leaves none behind
+    pending_path = save_minutes_pending(updates, sprint)
     print(f"Standup decisions captured in {pending_path}")
 
-    issues = load_jsonl(DATA_DIR / "issues.jsonl")
-    tasks = load_jsonl(DATA_DIR / "tasks.jsonl")
-    issue_map = {r["id"]: r for r in issues}
-    task_map = {r["id"]: r for r in tasks}
-
-    mlflow.set_experiment("status_updates")
-    with mlflow.start_run(run_name=f"{SPRINT_ID}_standup"):
-        mlflow.log_param("sprint", SPRINT_ID)
-        mlflow.log_param("num_updates", len(updates))
-
-        mlflow.log_param("issues_sha256_before", sha256_file(DATA_DIR / "issues.jsonl"))
-        mlflow.log_param("tasks_sha256_before", sha256_file(DATA_DIR / "tasks.jsonl"))
-
-        # Validate all transitions first
-        for u in updates:
-            rec = issue_map.get(u["id"]) if u["entity"] == "issue" else task_map.get(u["id"])
-            if rec is None:
-                raise SystemExit(f"ERROR: {u['entity']} '{u['id']}' not found")
-            old_status = rec["status"]
-            if u["status"] not in transitions.get(old_status, []):
-                raise SystemExit(f"ERROR: Illegal transition {old_status} → {u['status']} for {u['id']}")
-
-        # Apply updates
-        for u in updates:
-            rec = issue_map[u["id"]] if u["entity"] == "issue" else task_map[u["id"]]
-            old, ts = update_status(rec, u["status"], u["actor"], u["reason"])
-            key = f"{u['entity']}:{u['id']}"
-            mlflow.log_param(f"{key}_old_status", old)
-            mlflow.log_param(f"{key}_new_status", u["status"])
-            mlflow.log_param(f"{key}_timestamp", ts)
-            print(f"{key}: {old} → {u['status']} at {ts}")
-
-        save_jsonl(DATA_DIR / "issues.jsonl", list(issue_map.values()))
-        save_jsonl(DATA_DIR / "tasks.jsonl", list(task_map.values()))
-
-        mlflow.log_param("issues_sha256_after", sha256_file(DATA_DIR / "issues.jsonl"))
-        mlflow.log_param("tasks_sha256_after", sha256_file(DATA_DIR / "tasks.jsonl"))
+    # Per-update detail goes into one transaction artifact, not params
+    for entity in ENTITIES:
+        tracker.log_param(f"{entity}s_merkle_root_after", event_log.current_root(entity))
+    tracker.log_dict({"sprint": sprint, "transitions": events}, "transaction.json")
 
     final_minutes = finalize_minutes(pending_path)
     if final_minutes:
         print(f"Standup minutes finalized at {final_minutes}")
 
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--batch", action="store_true",
+                        help="Force interactive batch mode.")
+    parser.add_argument("--file", type=str,
+                        help="Path to a batch file containing updates.")
+    parser.add_argument("entity", nargs="?", choices=ENTITIES)
+    parser.add_argument("id", nargs="?")
+    parser.add_argument("status", nargs="?")
+    parser.add_argument("actor", nargs="?")
+    parser.add_argument("reason", nargs="?")
+    parser.add_argument("--tracking", choices=tracking.SINKS, default=tracking.DEFAULT_SINK,
+                        help="Experiment-tracking sink (default: $KE_TRACKING or mlflow).")
+    args = parser.parse_args()
+
+    sprint = current_sprint()
+    tracker = tracking.Tracker("status_updates", f"{sprint}_standup", sink=args.tracking)
+    try:
+        run(args, sprint, tracker)
+    finally:
+        # Failed runs are tracked too
+        tracker.close()
+
 if __name__ == "__main__":
     main()